@@ -0,0 +1,283 @@
+# Компактное хранение битовых последовательностей (8 бит в одном байте)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него работает вариант на int.bit_count
+    np = None
+
+# Таблица для удаления допустимых символов: всё, что останется, - ошибка
+_STRIP_BITS = str.maketrans('', '', '01')
+
+# Размер порции при подсчёте (байт): ограничивает временную память
+_CHUNK_BYTES = 1 << 20
+
+
+# Количество единичных битов в упакованных данных (popcount по машинным словам)
+def popcount(data) -> int:
+    if np is not None:
+        total = 0
+        for start in range(0, len(data), _CHUNK_BYTES):
+            total += int(_np_popcount(np.frombuffer(data[start:start + _CHUNK_BYTES], dtype=np.uint8)))
+        return total
+    total = 0
+    for start in range(0, len(data), _CHUNK_BYTES):
+        total += int.from_bytes(data[start:start + _CHUNK_BYTES], 'big').bit_count()
+    return total
+
+
+# Количество смен значения между соседними битами первых length бит:
+# popcount(x XOR (x >> 1)) с переносом граничного бита между порциями
+def count_transitions(data, length: int) -> int:
+    if length < 2:
+        return 0
+    data = data[:(length + 7) // 8]
+    total = 0
+    carry = 0  # последний бит предыдущей порции
+    for start in range(0, len(data), _CHUNK_BYTES):
+        chunk = data[start:start + _CHUNK_BYTES]
+        if np is not None:
+            x = np.frombuffer(chunk, dtype=np.uint8)
+            shifted = x >> 1
+            shifted[1:] |= (x[:-1] & 1) << 7
+            shifted[0] |= carry << 7
+            total += int(_np_popcount(np.bitwise_xor(x, shifted)))
+        else:
+            bits = len(chunk) * 8
+            x = int.from_bytes(chunk, 'big')
+            total += (x ^ ((x >> 1) | (carry << (bits - 1)))).bit_count()
+        carry = chunk[-1] & 1
+    # Первый бит сравнивался с нулём, а за последним битом идут нулевые биты дополнения
+    first = data[0] >> 7
+    last = (data[(length - 1) // 8] >> (7 - (length - 1) % 8)) & 1
+    total -= first
+    if length % 8:
+        total -= last
+    return total
+
+
+# Число единиц и смен бита в каждой из rows подряд идущих строк по row_bits бит.
+# При row_bits, кратном 8, строки обрабатываются одним двумерным проходом NumPy
+def row_statistics(bits, rows: int, row_bits: int) -> tuple:
+    if np is not None and row_bits % 8 == 0:
+        row_bytes = row_bits // 8
+        ones = np.empty(rows, dtype=np.int64)
+        transitions = np.empty(rows, dtype=np.int64)
+        # Порции по несколько строк ограничивают временную память
+        step = max(1, _CHUNK_BYTES // row_bytes)
+        data = bits.to_bytes()
+        for first in range(0, rows, step):
+            last = min(rows, first + step)
+            x = np.frombuffer(data[first * row_bytes:last * row_bytes], dtype=np.uint8).reshape(-1, row_bytes)
+            ones[first:last] = _np_row_popcount(x)
+            shifted = x >> 1
+            shifted[:, 1:] |= (x[:, :-1] & 1) << 7
+            # Первый бит строки сравнивается с нулём - вычитаем его
+            transitions[first:last] = _np_row_popcount(np.bitwise_xor(x, shifted)) - (x[:, 0] >> 7)
+        return ones.tolist(), transitions.tolist()
+
+    ones = []
+    transitions = []
+    for row in range(rows):
+        part = bits[row * row_bits:(row + 1) * row_bits]
+        ones.append(part.count(1))
+        transitions.append(part.transitions())
+    return ones, transitions
+
+
+# Число единиц в каждом из len(bits) // block_size полных блоков.
+# С NumPy возвращает массив, без него - список
+def block_ones(bits, block_size: int):
+    blocks = len(bits) // block_size
+    if np is None:
+        return [bits[i * block_size:(i + 1) * block_size].count(1) for i in range(blocks)]
+
+    data = bits.to_bytes()
+    ones = np.empty(blocks, dtype=np.int64)
+    if block_size % 8 == 0:
+        # Блоки выровнены по байтам: popcount строк двумерного массива
+        row_bytes = block_size // 8
+        step = max(1, _CHUNK_BYTES // row_bytes)
+        for first in range(0, blocks, step):
+            last = min(blocks, first + step)
+            x = np.frombuffer(data[first * row_bytes:last * row_bytes], dtype=np.uint8)
+            ones[first:last] = _np_row_popcount(x.reshape(-1, row_bytes))
+        return ones
+    # Порция из кратного 8 числа блоков всегда начинается на границе байта
+    step = max(8, (_CHUNK_BYTES * 8 // block_size) // 8 * 8)
+    for first in range(0, blocks, step):
+        last = min(blocks, first + step)
+        chunk = bits.unpack(first * block_size, last * block_size)
+        ones[first:last] = chunk.reshape(-1, block_size).sum(axis=1, dtype=np.int64)
+    return ones
+
+
+# Popcount каждой строки двумерного массива байтов
+def _np_row_popcount(x):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(x, axis=1).sum(axis=1, dtype=np.int64)
+
+
+# Popcount массива байтов средствами NumPy
+def _np_popcount(x):
+    if hasattr(np, 'bitwise_count'):
+        # NumPy >= 2.0: аппаратный popcount по 64-битным словам
+        words = len(x) // 8
+        total = np.bitwise_count(x[:words * 8].view(np.uint64)).sum(dtype=np.int64)
+        return total + np.bitwise_count(x[words * 8:]).sum(dtype=np.int64)
+    return np.unpackbits(x).sum(dtype=np.int64)
+
+
+# Битовая последовательность, упакованная в bytes (старший бит байта идёт первым)
+class BitSequence:
+    # Инициализация из упакованных байтов и длины в битах
+    def __init__(self, data=b'', length=None):
+        data = bytes(data)
+        if length is None:
+            length = len(data) * 8
+        if length < 0 or length > len(data) * 8:
+            raise ValueError("длина не соответствует размеру данных")
+        nbytes = (length + 7) // 8
+        data = data[:nbytes]
+        # Хвостовые биты последнего байта всегда обнуляются
+        tail = length % 8
+        if tail:
+            data = data[:-1] + bytes([data[-1] & (0xFF << (8 - tail)) & 0xFF])
+        self._data = data
+        self._length = length
+
+    # Создание из строки вида '0101...'
+    @classmethod
+    def from_str(cls, text):
+        bad = text.translate(_STRIP_BITS)
+        if bad:
+            raise ValueError(f'некорректный символ "{bad[0]}"')
+        if not text:
+            return cls()
+        return cls.from_int(int(text, 2), len(text))
+
+    # Создание из целого числа: length младших бит value, старший бит первым
+    @classmethod
+    def from_int(cls, value, length):
+        nbytes = (length + 7) // 8
+        pad = nbytes * 8 - length
+        value &= (1 << length) - 1
+        return cls((value << pad).to_bytes(nbytes, 'big'), length)
+
+    # Создание из итерируемого набора битов (0/1 или '0'/'1')
+    @classmethod
+    def from_bits(cls, bits):
+        data = bytearray()
+        byte = 0
+        count = 0
+        for bit in bits:
+            if bit in (1, '1'):
+                byte = (byte << 1) | 1
+            elif bit in (0, '0'):
+                byte <<= 1
+            else:
+                raise ValueError(f'некорректный символ "{bit}"')
+            count += 1
+            if count % 8 == 0:
+                data.append(byte)
+                byte = 0
+        if count % 8:
+            data.append(byte << (8 - count % 8))
+        return cls(data, count)
+
+    # Приведение строки или BitSequence к BitSequence
+    @classmethod
+    def coerce(cls, sequence):
+        if isinstance(sequence, cls):
+            return sequence
+        if isinstance(sequence, str):
+            return cls.from_str(sequence)
+        return cls.from_bits(sequence)
+
+    # Упакованное представление последовательности
+    def to_bytes(self):
+        return self._data
+
+    # Последовательность как одно целое число (первый бит - старший)
+    def to_int(self):
+        return int.from_bytes(self._data, 'big') >> (len(self._data) * 8 - self._length)
+
+    # Преобразование в строковую форму '0101...'
+    def to_str(self):
+        if not self._length:
+            return ''
+        return format(self.to_int(), 'b').zfill(self._length)
+
+    # Биты участка [start, stop) как массив NumPy из 0 и 1 (uint8)
+    def unpack(self, start=0, stop=None):
+        if stop is None:
+            stop = self._length
+        first = start // 8
+        x = np.unpackbits(np.frombuffer(self._data[first:(stop + 7) // 8], dtype=np.uint8))
+        return x[start - first * 8:stop - first * 8]
+
+    # Количество единиц (value=1) или нулей (value=0)
+    def count(self, value=1):
+        ones = popcount(self._data)
+        if value in (1, '1'):
+            return ones
+        if value in (0, '0'):
+            return self._length - ones
+        raise ValueError(f'некорректный символ "{value}"')
+
+    # Количество смен значения между соседними битами
+    def transitions(self):
+        return count_transitions(self._data, self._length)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        full, tail = divmod(self._length, 8)
+        for byte in self._data[:full]:
+            for shift in range(7, -1, -1):
+                yield (byte >> shift) & 1
+        if tail:
+            byte = self._data[full]
+            for shift in range(7, 7 - tail, -1):
+                yield (byte >> shift) & 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return BitSequence.from_str(self.to_str()[index])
+            if stop <= start:
+                return BitSequence()
+            first = start // 8
+            last = (stop + 7) // 8
+            if start % 8 == 0:
+                # Срез, выровненный по байту, копируется без сдвигов
+                return BitSequence(self._data[first:last], stop - start)
+            value = int.from_bytes(self._data[first:last], 'big')
+            value >>= (last * 8 - stop)
+            return BitSequence.from_int(value, stop - start)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("индекс вне последовательности")
+        return (self._data[index // 8] >> (7 - index % 8)) & 1
+
+    # Сравнение только с BitSequence: хэш не совпадает с хэшем строки, поэтому
+    # равенство со строкой нарушило бы работу множеств и словарей (есть to_str())
+    def __eq__(self, other):
+        if isinstance(other, BitSequence):
+            return self._length == other._length and self._data == other._data
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._length, self._data))
+
+    def __str__(self):
+        return self.to_str()
+
+    def __repr__(self):
+        preview = self[:32].to_str()
+        if self._length > 32:
+            preview += '...'
+        return f"BitSequence('{preview}', length={self._length})"
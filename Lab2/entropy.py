@@ -0,0 +1,628 @@
+# Оценки минимальной энтропии двоичного источника (NIST SP 800-90B, 6.3):
+# наиболее частое значение, коллизии, марковская модель, сжатие, t-кортежи и
+# самая длинная повторяющаяся подстрока (LRS)
+import math
+from bitsequence import BitSequence, count_transitions
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy оценки считаются на чистом Python, но медленнее
+    np = None
+
+# Квантиль для верхней границы 99%-го доверительного интервала
+Z_ALPHA = 2.576
+
+# Число вхождений самого частого кортежа, до которого считаются t-кортежи (6.3.5, 6.3.6)
+TUPLE_CUTOFF = 35
+
+# Параметры оценки сжатия (6.3.4): длина блока, размер словаря, поправочный множитель
+COMPRESSION_BLOCK = 6
+COMPRESSION_DICTIONARY = 1000
+COMPRESSION_FACTOR = 0.5907
+
+# Длина окна, с которого начинается построение суффиксного массива удвоением
+_SUFFIX_WINDOW = 56
+
+
+# Проверка последовательности (строка из 0 и 1 или BitSequence)
+def _prepare(bit_sequence: str | BitSequence, min_length: int = 2) -> BitSequence:
+    bits = BitSequence.coerce(bit_sequence)
+    if len(bits) < min_length:
+        raise ValueError(f"Для оценки нужно не менее {min_length} бит, получено {len(bits)}")
+    return bits
+
+
+# Результат оценки по вероятности самого вероятного значения (на один бит)
+def _estimate(title: str, probability: float, details: str, bits_per_sample: int = 1) -> dict:
+    min_entropy = -math.log2(probability) / bits_per_sample if probability > 0 else 1.0
+    min_entropy = min(max(min_entropy, 0.0), 1.0)
+    return {
+        'min_entropy': min_entropy,
+        'probability': probability,
+        'description': (
+            f"{title}\n"
+            f"{details}"
+            f"Минимальная энтропия: {min_entropy:.6f} бит на бит"
+        )
+    }
+
+
+# Верхняя граница 99%-го доверительного интервала для вероятности p по n наблюдениям
+def _upper_bound(p: float, n: int) -> float:
+    return min(1.0, p + Z_ALPHA * math.sqrt(p * (1 - p) / (n - 1)))
+
+
+# Оценка по наиболее частому значению (6.3.1)
+def most_common_value_estimate(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence)
+    n = len(bits)
+    ones = bits.count(1)
+    p_hat = max(ones, n - ones) / n
+    p_u = _upper_bound(p_hat, n)
+    return _estimate(
+        'Оценка по наиболее частому значению',
+        p_u,
+        f"Длина последовательности: {n} бит, единиц: {ones}\n"
+        f"Доля самого частого значения: {p_hat:.6f}, верхняя граница: {p_u:.6f}\n"
+    )
+
+
+# Таблицы разбора на коллизии по 16-битным словам (байт и следующий за ним):
+# для входного смещения e = 0..2 - число коллизий длины 2 и 3 внутри байта
+# и смещение, с которым разбор входит в следующий байт (строятся при первом использовании)
+_collision_tables = None
+
+
+def _get_collision_tables() -> tuple:
+    global _collision_tables
+    if _collision_tables is None:
+        words = np.arange(65536, dtype=np.int64)
+        exits = np.empty((65536, 3), dtype=np.int64)
+        twos = np.zeros((65536, 3), dtype=np.int64)
+        threes = np.zeros((65536, 3), dtype=np.int64)
+        for entry in range(3):
+            position = np.full(65536, entry, dtype=np.int64)
+            # В байте не больше четырёх коллизий
+            for _ in range(4):
+                active = position < 8
+                same = ((words >> (15 - position)) & 1) == ((words >> (14 - position)) & 1)
+                twos[:, entry] += active & same
+                threes[:, entry] += active & ~same
+                position = np.where(active, position + np.where(same, 2, 3), position)
+            exits[:, entry] = position - 8
+        _collision_tables = (exits, twos, threes)
+    return _collision_tables
+
+
+# Число коллизий длины 2 и 3 при разборе последовательности с начала (6.3.2):
+# коллизия длины 2 - пара одинаковых битов, иначе третий бит совпадает с одним из двух.
+# Байты переводят смещение разбора (0..2) в следующее по таблицам, а переходы всех
+# байтов объединяются попарным сведением (композиция отображений), без цикла по битам
+def _collision_counts(bits) -> tuple:
+    n = len(bits)
+    position = twos = threes = 0
+    if np is not None and n >= 10:
+        # Байт k читает биты до 8k + 9 включительно
+        full = (n - 10) // 8 + 1
+        data = np.frombuffer(bits.to_bytes()[:full + 1] + bytes(1), dtype=np.uint8).astype(np.int64)
+        words = (data[:full] << 8) | data[1:full + 1]
+        exits, two_table, three_table = _get_collision_tables()
+        exits, two_table, three_table = exits[words], two_table[words], three_table[words]
+        while len(exits) > 1:
+            if len(exits) % 2:
+                # Тождественный переход дополняет число байтов до чётного
+                exits = np.vstack([exits, np.arange(3)])
+                two_table = np.vstack([two_table, np.zeros(3, dtype=np.int64)])
+                three_table = np.vstack([three_table, np.zeros(3, dtype=np.int64)])
+            rows = np.arange(len(exits) // 2)[:, None]
+            middle = exits[0::2]
+            two_table = two_table[0::2] + two_table[1::2][rows, middle]
+            three_table = three_table[0::2] + three_table[1::2][rows, middle]
+            exits = exits[1::2][rows, middle]
+        twos = int(two_table[0, 0])
+        threes = int(three_table[0, 0])
+        position = full * 8 + int(exits[0, 0])
+    # Оставшиеся биты (или вся последовательность без NumPy)
+    tail = list(bits[position:])
+    i = 0
+    while i + 1 < len(tail):
+        if tail[i] == tail[i + 1]:
+            twos += 1
+            i += 2
+        elif i + 2 < len(tail):
+            threes += 1
+            i += 3
+        else:
+            break
+    return twos, threes
+
+
+# Оценка по коллизиям (6.3.2, только для двоичных источников). Для двоичного источника
+# E[t] = 2 + 2p(1 - p), поэтому уравнение для p решается в явном виде
+def collision_estimate(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence, 6)
+    twos, threes = _collision_counts(bits)
+    v = twos + threes
+    mean = (2 * twos + 3 * threes) / v
+    sigma = math.sqrt((twos * (2 - mean) ** 2 + threes * (3 - mean) ** 2) / (v - 1))
+    lower = mean - Z_ALPHA * sigma / math.sqrt(v)
+    if lower >= 2.5:
+        p = 0.5
+    else:
+        p = min(1.0, 0.5 + math.sqrt(0.25 - (lower - 2) / 2))
+    return _estimate(
+        'Оценка по коллизиям',
+        p,
+        f"Длина последовательности: {len(bits)} бит\n"
+        f"Коллизий: {v} (длины 2: {twos}, длины 3: {threes})\n"
+        f"Среднее расстояние: {mean:.6f}, нижняя граница: {lower:.6f}\n"
+        f"Вероятность самого вероятного значения: {p:.6f}\n"
+    )
+
+
+# Оценка по марковской модели первого порядка (6.3.3). Числа пар 00, 01, 10, 11
+# выражаются через число единиц, смен бита и крайние биты, поэтому отдельный проход
+# по парам не нужен
+def markov_estimate(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence)
+    n = len(bits)
+    ones = bits.count(1)
+    transitions = count_transitions(bits.to_bytes(), n)
+    ones_head = ones - bits[-1]  # единицы среди b_0..b_(n-2)
+    ones_tail = ones - bits[0]  # единицы среди b_1..b_(n-1)
+    o11 = (ones_head + ones_tail - transitions) // 2
+    o10 = ones_head - o11
+    o01 = ones_tail - o11
+    o00 = n - 1 - o11 - o10 - o01
+
+    def ratio(a, b):
+        return a / b if b else 0.0
+
+    p0 = (n - ones) / n
+    p1 = ones / n
+    p00, p01 = ratio(o00, o00 + o01), ratio(o01, o00 + o01)
+    p10, p11 = ratio(o10, o10 + o11), ratio(o11, o10 + o11)
+
+    def log2(x):
+        return math.log2(x) if x > 0 else -math.inf
+
+    # Логарифмы вероятностей шести кандидатов на самую вероятную цепочку из 128 бит
+    candidates = [
+        log2(p0) + 127 * log2(p00),
+        log2(p0) + 64 * log2(p01) + 63 * log2(p10),
+        log2(p0) + log2(p01) + 126 * log2(p11),
+        log2(p1) + log2(p10) + 126 * log2(p00),
+        log2(p1) + 64 * log2(p10) + 63 * log2(p01),
+        log2(p1) + 127 * log2(p11),
+    ]
+    best = max(candidates)
+    min_entropy = min(-best / 128, 1.0)
+    return {
+        'min_entropy': min_entropy,
+        'probability': 2 ** -min_entropy,
+        'description': (
+            f"Оценка по марковской модели\n"
+            f"Длина последовательности: {n} бит\n"
+            f"P0 = {p0:.6f}, P1 = {p1:.6f}\n"
+            f"P00 = {p00:.6f}, P01 = {p01:.6f}, P10 = {p10:.6f}, P11 = {p11:.6f}\n"
+            f"Минимальная энтропия: {min_entropy:.6f} бит на бит"
+        )
+    }
+
+
+# Значения непересекающихся b-битных блоков
+def _block_values(bits, block: int, count: int):
+    if np is None:
+        return [bits[i * block:(i + 1) * block].to_int() for i in range(count)]
+    weights = 1 << np.arange(block - 1, -1, -1)
+    return bits.unpack(0, count * block).reshape(count, block).astype(np.int64) @ weights
+
+
+# Расстояния D_i до предыдущего появления того же блока (или i, если его не было),
+# i = 1..count. С NumPy - устойчивая сортировка по значению блока
+def _block_distances(values):
+    if np is None:
+        last = {}
+        distances = []
+        for i, value in enumerate(values, 1):
+            distances.append(i - last.get(value, 0))
+            last[value] = i
+        return distances
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    positions = order + 1
+    previous = np.zeros(len(values), dtype=np.int64)
+    same = ordered[1:] == ordered[:-1]
+    previous[1:][same] = positions[:-1][same]
+    distances = np.empty(len(values), dtype=np.int64)
+    distances[order] = positions - previous
+    return distances
+
+
+# Ожидаемое среднее log2 расстояния G(z) (6.3.4):
+# G(z) = 1/ν Σ_(t=d+1..L') [Σ_(u<t) log2(u)·z²(1-z)^(u-1) + log2(t)·z(1-z)^(t-1)].
+# Двойная сумма сворачивается: каждое u < t входит в неё L' - max(d, u) раз,
+# поэтому G(z) считается за O(L'); слагаемые, где (1-z)^(u-1) < 1e-300, отбрасываются
+def _compression_g(z: float, count: int, dictionary: int, logs, weights) -> float:
+    if z >= 1:
+        return 0.0
+    limit = count
+    if z > 0:
+        limit = min(count, int(700 / -math.log1p(-z)) + 2)
+    tests = count - dictionary
+    if np is None:
+        first = second = 0.0
+        power = 1.0
+        for u in range(1, limit + 1):
+            if u < count:
+                first += logs[u - 1] * weights[u - 1] * power
+            if u > dictionary:
+                second += logs[u - 1] * power
+            power *= 1 - z
+        return (z * z * first + z * second) / tests
+    powers = np.exp(np.arange(limit) * math.log1p(-z))
+    first = float(np.dot(logs[:min(limit, count - 1)] * weights[:min(limit, count - 1)],
+                         powers[:min(limit, count - 1)]))
+    second = float(np.dot(logs[dictionary:limit], powers[dictionary:limit])) if limit > dictionary else 0.0
+    return (z * z * first + z * second) / tests
+
+
+# Оценка по сжатию (6.3.4, алгоритм Маурера с блоками по 6 бит)
+def compression_estimate(bit_sequence: str | BitSequence) -> dict:
+    b = COMPRESSION_BLOCK
+    d = COMPRESSION_DICTIONARY
+    bits = _prepare(bit_sequence, b * (d + 2))
+    count = len(bits) // b
+    tests = count - d
+
+    # 1. Расстояния до предыдущих появлений блоков тестовой части
+    distances = _block_distances(_block_values(bits, b, count))
+    if np is None:
+        logs = [math.log2(distance) for distance in distances[d:]]
+        mean = sum(logs) / tests
+        square = sum(value * value for value in logs) / tests
+    else:
+        logs = np.log2(distances[d:].astype(np.float64))
+        mean = float(logs.mean())
+        square = float((logs * logs).mean())
+    sigma = COMPRESSION_FACTOR * math.sqrt(max(square - mean * mean, 0.0))
+    lower = mean - Z_ALPHA * sigma / math.sqrt(tests)
+
+    # 2. Решение G(p) + (2^b - 1)·G(q) = X' двоичным поиском, q = (1 - p)/(2^b - 1)
+    if np is None:
+        u_logs = [math.log2(u) for u in range(1, count + 1)]
+        weights = [count - max(d, u) for u in range(1, count)]
+    else:
+        u_logs = np.log2(np.arange(1, count + 1, dtype=np.float64))
+        weights = (count - np.maximum(d, np.arange(1, count))).astype(np.float64)
+    others = 2 ** b - 1
+
+    def expected(p):
+        return (_compression_g(p, count, d, u_logs, weights) +
+                others * _compression_g((1 - p) / others, count, d, u_logs, weights))
+
+    low, high = 2 ** -b, 1.0
+    if lower >= expected(low):
+        p = low
+    else:
+        # Ожидаемое значение убывает с ростом p
+        for _ in range(50):
+            middle = (low + high) / 2
+            if expected(middle) > lower:
+                low = middle
+            else:
+                high = middle
+        p = (low + high) / 2
+
+    return _estimate(
+        'Оценка по сжатию',
+        p,
+        f"Длина последовательности: {len(bits)} бит\n"
+        f"Блоков по {b} бит: {count}, словарь: {d}, тестовых блоков: {tests}\n"
+        f"Среднее log2 расстояния: {mean:.6f}, нижняя граница: {lower:.6f}\n"
+        f"Вероятность самого вероятного блока: {p:.6f}\n",
+        bits_per_sample=b
+    )
+
+
+# Число значащих битов каждого элемента массива (элементы < 2^56)
+def _bit_lengths(values):
+    high = values >> 28
+    low = values & ((1 << 28) - 1)
+    # frexp точен для чисел меньше 2^53
+    return np.where(high > 0, 28 + np.frexp(high.astype(np.float64))[1], np.frexp(low.astype(np.float64))[1])
+
+
+# 56-битные окна, начинающиеся в каждой позиции (за концом последовательности - нули);
+# берутся из 64-битных слов, начинающихся с каждого байта
+def _windows(bits):
+    n = len(bits)
+    data = np.frombuffer(bits.to_bytes() + bytes(8), dtype=np.uint8)
+    nbytes = (n + 7) // 8
+    words = np.zeros(nbytes, dtype=np.uint64)
+    for j in range(8):
+        words |= data[j:j + nbytes].astype(np.uint64) << np.uint64(56 - 8 * j)
+    shifts = np.arange(8, 0, -1, dtype=np.uint64)
+    windows = (words[:, None] >> shifts[None, :]) & np.uint64((1 << _SUFFIX_WINDOW) - 1)
+    return windows.ravel()[:n].astype(np.int64)
+
+
+# Суффиксный массив и массив LCP (lcp[k] - длина общего префикса суффиксов sa[k - 1]
+# и sa[k], lcp[0] = 0). Сначала суффиксы сортируются по начальному окну и длине:
+# позиция упакована в младшие биты ключа, поэтому хватает сортировки значений,
+# а LCP соседей из разных групп сразу получается из соседних ключей. Затем удвоением
+# уточняется порядок только в группах с одинаковым ключом (их обычно немного):
+# ранг суффикса - номер первой позиции его группы в массиве, для суффиксов вне групп
+# он находится двоичным поиском по отсортированным ключам. LCP внутри групп
+# добирается сравнением 56-битных окон
+def suffix_structure(bits, windows=None) -> tuple:
+    n = len(bits)
+    if np is None:
+        return _suffix_structure_python(bits)
+    if windows is None:
+        windows = _windows(bits)
+
+    # 1. Сортировка по окну из width бит и длине суффикса (для суффиксов короче окна);
+    # окно не длиннее 52 бит, чтобы длина общего префикса считалась точно через frexp
+    index_bits = max(1, (n - 1).bit_length())
+    width = min(52, 57 - index_bits)
+    positions = np.arange(n, dtype=np.int64)
+    keys = (windows >> (_SUFFIX_WINDOW - width)) << 6 | np.minimum(n - positions, width)
+    ordered = np.sort(keys << index_bits | positions)
+    sa = ordered & ((1 << index_bits) - 1)
+    ordered >>= index_bits
+    equal = ordered[1:] == ordered[:-1]
+    common = width - np.frexp(((ordered[1:] ^ ordered[:-1]) >> 6).astype(np.float64))[1]
+    common = np.minimum(common, np.minimum(ordered[1:] & 63, ordered[:-1] & 63))
+
+    # 2. Удвоение в группах одинаковых ключей
+    in_group = np.zeros(n, dtype=bool)
+    in_group[1:] |= equal
+    in_group[:-1] |= equal
+    slots = np.flatnonzero(in_group)
+    tracked = np.sort(sa[slots])
+    tracked_rank = np.empty(len(tracked), dtype=np.int64)
+    tracked_rank[np.searchsorted(tracked, sa[slots])] = np.searchsorted(ordered, ordered[slots])
+
+    def rank(where):
+        result = np.searchsorted(ordered, keys[where])
+        index = np.minimum(np.searchsorted(tracked, where), max(len(tracked) - 1, 0))
+        hit = tracked[index] == where if len(tracked) else np.zeros(len(where), dtype=bool)
+        result[hit] = tracked_rank[index[hit]]
+        return result
+
+    length = width
+    while len(slots):
+        suffixes = sa[slots]
+        group = rank(suffixes)
+        following = np.full(len(slots), -1, dtype=np.int64)
+        inside = suffixes + length < n
+        following[inside] = rank(suffixes[inside] + length)
+        order = np.lexsort((following, group))
+        suffixes = suffixes[order]
+        group = group[order]
+        following = following[order]
+        sa[slots] = suffixes
+        starts = np.concatenate(([True], (group[1:] != group[:-1]) | (following[1:] != following[:-1])))
+        heads = slots[np.maximum.accumulate(np.where(starts, np.arange(len(slots)), 0))]
+        tracked_rank[np.searchsorted(tracked, suffixes)] = heads
+        single = starts & np.concatenate((starts[1:], [True]))
+        slots = slots[~single]
+        length *= 2
+
+    # 3. LCP соседних суффиксов с одинаковым ключом - по 56-битным окнам
+    active = np.flatnonzero(equal)
+    first = sa[active]
+    second = sa[active + 1]
+    while len(active):
+        a = first + common[active]
+        b = second + common[active]
+        remaining = np.minimum(n - a, n - b)
+        # Суффикс длины ровно width заканчивается на a = n: там remaining = 0
+        x = windows[np.minimum(a, n - 1)] ^ windows[np.minimum(b, n - 1)]
+        step = np.minimum(_SUFFIX_WINDOW - _bit_lengths(x), remaining)
+        common[active] += step
+        more = (step == _SUFFIX_WINDOW) & (remaining > _SUFFIX_WINDOW)
+        active = active[more]
+        first = first[more]
+        second = second[more]
+    return sa, np.concatenate(([0], common))
+
+
+# Суффиксный массив (удвоение со стандартной сортировкой) и LCP алгоритмом Касаи
+def _suffix_structure_python(bits) -> tuple:
+    text = list(bits)
+    n = len(text)
+    rank = text[:]
+    length = 1
+    sa = list(range(n))
+    while True:
+        keys = [(rank[i], rank[i + length] if i + length < n else -1) for i in range(n)]
+        sa.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        for k in range(1, n):
+            new_rank[sa[k]] = new_rank[sa[k - 1]] + (keys[sa[k]] != keys[sa[k - 1]])
+        rank = new_rank
+        if rank[sa[-1]] == n - 1:
+            break
+        length *= 2
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        if rank[i] > 0:
+            j = sa[rank[i] - 1]
+            while i + h < n and j + h < n and text[i + h] == text[j + h]:
+                h += 1
+            lcp[rank[i]] = h
+            h = max(h - 1, 0)
+        else:
+            h = 0
+    return sa, lcp
+
+
+# Наибольшая длина кортежа, для которой частоты считаются таблицей (bincount окон)
+_TUPLE_TABLE_BITS = 20
+
+
+# Для длин W = 1..v (v - длина самой длинной повторяющейся подстроки): число вхождений
+# самого частого W-кортежа и число пар одинаковых W-кортежей Σ C(c_i, 2).
+# Короткие кортежи считаются таблицей частот окон. Для длинных одинаковые кортежи -
+# подряд идущие суффиксы с LCP ≥ W; с ростом W из списка связей удаляются те,
+# у которых LCP < W, поэтому обрабатываются только связи, ещё образующие группы
+def tuple_statistics(bits) -> tuple:
+    n = len(bits)
+    most_common = []
+    pairs = []
+    if np is None:
+        _, lcp = suffix_structure(bits)
+        longest = max(lcp)
+        for w in range(1, longest + 1):
+            best = run = 0
+            total = 0
+            for value in lcp[1:] + [0]:
+                if value >= w:
+                    run += 1
+                else:
+                    total += run * (run + 1) // 2
+                    best = max(best, run)
+                    run = 0
+            most_common.append(best + 1)
+            pairs.append(total)
+        return most_common, pairs
+
+    windows = _windows(bits)
+    _, lcp = suffix_structure(bits, windows)
+    longest = int(lcp.max())
+    # Частоты самых длинных табличных кортежей - один bincount; для более коротких
+    # они сворачиваются по последним битам, и добавляются кортежи из последних позиций
+    table = min(longest, _TUPLE_TABLE_BITS)
+    if table:
+        counts = np.bincount(windows[:n - table + 1] >> (_SUFFIX_WINDOW - table), minlength=1 << table)
+        for w in range(1, table + 1):
+            short = counts.reshape(1 << w, -1).sum(axis=1)
+            tail = windows[n - table + 1:n - w + 1] >> (_SUFFIX_WINDOW - w)
+            short += np.bincount(tail, minlength=1 << w)
+            most_common.append(int(short.max()))
+            pairs.append(int((short * (short - 1) // 2).sum()))
+
+    w = len(most_common) + 1
+    links = (np.flatnonzero(lcp >= w)).astype(np.int32)
+    values = lcp[links].astype(np.int32)
+    while len(links):
+        # Группы - серии подряд идущих номеров связей; в серии из r связей r + 1 кортеж
+        breaks = np.flatnonzero(np.diff(links) != 1)
+        runs = np.diff(np.concatenate(([-1], breaks, [len(links) - 1])))
+        most_common.append(int(runs.max()) + 1)
+        pairs.append(int((runs * (runs + 1) // 2).sum()))
+        w += 1
+        keep = values >= w
+        links = links[keep]
+        values = values[keep]
+    return most_common, pairs
+
+
+# Оценка по t-кортежам (6.3.5) по готовой статистике кортежей
+def _t_tuple_from_stats(n: int, most_common: list) -> dict:
+    t = sum(1 for count in most_common if count >= TUPLE_CUTOFF)
+    if t == 0:
+        raise ValueError(f"Ни одно значение не встречается {TUPLE_CUTOFF} раз: последовательность слишком коротка")
+    p_max = max((most_common[i - 1] / (n - i + 1)) ** (1 / i) for i in range(1, t + 1))
+    p_u = _upper_bound(p_max, n)
+    return _estimate(
+        'Оценка по t-кортежам',
+        p_u,
+        f"Длина последовательности: {n} бит\n"
+        f"Наибольшая длина кортежа t: {t}\n"
+        f"P_max = {p_max:.6f}, верхняя граница: {p_u:.6f}\n"
+    )
+
+
+# Оценка по самой длинной повторяющейся подстроке (6.3.6) по готовой статистике кортежей.
+# Если повторяющихся кортежей длины u нет, оценка неприменима (min_entropy = None)
+def _lrs_from_stats(n: int, most_common: list, pairs: list) -> dict:
+    u = sum(1 for count in most_common if count >= TUPLE_CUTOFF) + 1
+    v = len(most_common)
+    if u > v:
+        return {
+            'min_entropy': None,
+            'probability': None,
+            'description': (
+                f"Оценка по самой длинной повторяющейся подстроке\n"
+                f"Длина самой длинной повторяющейся подстроки v = {v} меньше u = {u}: оценка неприменима"
+            )
+        }
+    p_max = max((pairs[w - 1] / math.comb(n - w + 1, 2)) ** (1 / w) for w in range(u, v + 1))
+    p_u = _upper_bound(p_max, n)
+    return _estimate(
+        'Оценка по самой длинной повторяющейся подстроке',
+        p_u,
+        f"Длина последовательности: {n} бит\n"
+        f"Длины кортежей: u = {u} .. v = {v}\n"
+        f"P_max = {p_max:.6f}, верхняя граница: {p_u:.6f}\n"
+    )
+
+
+# Оценка по t-кортежам (6.3.5)
+def t_tuple_estimate(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence)
+    most_common, _ = tuple_statistics(bits)
+    return _t_tuple_from_stats(len(bits), most_common)
+
+
+# Оценка по самой длинной повторяющейся подстроке (6.3.6)
+def lrs_estimate(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence)
+    most_common, pairs = tuple_statistics(bits)
+    return _lrs_from_stats(len(bits), most_common, pairs)
+
+
+# Оценки минимальной энтропии: имя -> название
+ESTIMATORS = {
+    'most_common_value': 'Наиболее частое значение',
+    'collision': 'Коллизии',
+    'markov': 'Марковская модель',
+    'compression': 'Сжатие',
+    't_tuple': 't-кортежи',
+    'lrs': 'Самая длинная повторяющаяся подстрока',
+}
+
+
+# Все оценки сразу; итоговая минимальная энтропия - наименьшая из применимых.
+# Суффиксный массив строится один раз для t-кортежей и LRS
+def estimate_min_entropy(bit_sequence: str | BitSequence) -> dict:
+    bits = _prepare(bit_sequence, COMPRESSION_BLOCK * (COMPRESSION_DICTIONARY + 2))
+    n = len(bits)
+    most_common, pairs = tuple_statistics(bits)
+    estimates = {
+        'most_common_value': most_common_value_estimate(bits),
+        'collision': collision_estimate(bits),
+        'markov': markov_estimate(bits),
+        'compression': compression_estimate(bits),
+        't_tuple': _t_tuple_from_stats(n, most_common),
+        'lrs': _lrs_from_stats(n, most_common, pairs),
+    }
+    applicable = {name: result['min_entropy'] for name, result in estimates.items()
+                  if result['min_entropy'] is not None}
+    weakest = min(applicable, key=applicable.get)
+    min_entropy = applicable[weakest]
+
+    description = (
+        f"Оценка минимальной энтропии (NIST SP 800-90B)\n"
+        f"Длина последовательности: {n} бит\n"
+        + ''.join(f"{ESTIMATORS[name]}: {value:.6f}\n" for name, value in applicable.items()) +
+        f"Итоговая минимальная энтропия: {min_entropy:.6f} бит на бит ({ESTIMATORS[weakest]})"
+    )
+
+    return {
+        'min_entropy': min_entropy,
+        'estimates': estimates,
+        'description': description
+    }
+
+
+# Для тестирования модуля
+if __name__ == "__main__":
+    import secrets
+
+    sequence = BitSequence.from_int(secrets.randbits(1_000_000), 1_000_000)
+    print(estimate_min_entropy(sequence)['description'])
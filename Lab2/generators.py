@@ -1,10 +1,57 @@
 import time
 import math
+from concurrent.futures import ProcessPoolExecutor
+from bitsequence import BitSequence
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy биты генерируются по одному
+    np = None
+
+# Число соседних состояний Парка-Миллера, продвигаемых одной векторной операцией
+_LEAPFROG_WIDTH = 1 << 12
+
+# Число строк по _LEAPFROG_WIDTH состояний в одной порции (ограничивает временную память)
+_LEAPFROG_ROWS = 256
+
+# Число шагов BBS, биты которых собираются в одно целое число перед упаковкой
+_BBS_BATCH = 1 << 12
+
+
+# Режимы извлечения битов из состояния Парка-Миллера и число бит за шаг по умолчанию.
+# EXTRACTION_NOTES - скорость и качество каждого режима (NumPy, 10^6 бит, tests.run_battery)
+EXTRACTION_MODES = {'lsb': 1, 'top': 8, 'all': 31, 'random': 8}
+EXTRACTION_NOTES = {
+    'lsb': 'младший бит: 1 бит за шаг, около 45 Мбит/с; все 16 тестов пройдены',
+    'top': 'k старших бит: k бит за шаг, около 310 Мбит/с; не пройден тест автокорреляции - '
+           'a^1311 ≡ -116 (mod m), и старшие биты состояний через 1311 шагов связаны',
+    'all': 'все 31 бит: около 340 Мбит/с; не пройдены тест автокорреляции и спектральный тест',
+    'random': 'k бит числа floor(random() * 2^k): около 270-300 Мбит/с; как top, '
+              'не пройден тест автокорреляции'
+}
+
+
+# Участок потока Парка-Миллера, начинающийся с состояния state (выполняется в отдельном процессе)
+def _park_miller_slice(state, n, extraction='lsb', bits_per_step=None):
+    return ParkMillerGenerator(state, extraction, bits_per_step).random_bits(n, packed=True).to_bytes()
+
+
+# Упаковка k-битных значений (старший бит первым) в массив байтов
+def _pack_values(values, k):
+    values = values.ravel()
+    if k == 1:
+        return np.packbits(values.astype(np.uint8))
+    octets = values.astype('>u4').view(np.uint8).reshape(-1, 4)
+    if k % 8 == 0:
+        return octets[:, 4 - k // 8:].ravel()
+    return np.packbits(np.unpackbits(octets, axis=1)[:, 32 - k:])
 
 # Генератор Парка-Миллера (линейный конгруэнтный генератор)
 class ParkMillerGenerator:
-    # Инициализация генератора Парка-Миллера
-    def __init__(self, seed=None):
+    # Инициализация генератора Парка-Миллера.
+    # extraction - режим извлечения битов (EXTRACTION_MODES), bits_per_step - число
+    # бит за шаг для режимов top и random (1..31)
+    def __init__(self, seed=None, extraction='lsb', bits_per_step=None):
         self.m = 2 ** 31 - 1  # модуль
         self.a = 16807  # множитель (7^5)
         if seed is None:
@@ -14,6 +61,16 @@ class ParkMillerGenerator:
         self.state = seed % self.m
         if self.state == 0:
             self.state = 1
+        if extraction not in EXTRACTION_MODES:
+            raise ValueError(f"Неизвестный режим извлечения битов: {extraction}")
+        if bits_per_step is None:
+            bits_per_step = EXTRACTION_MODES[extraction]
+        if extraction in ('lsb', 'all') and bits_per_step != EXTRACTION_MODES[extraction]:
+            raise ValueError(f"В режиме {extraction} число бит за шаг равно {EXTRACTION_MODES[extraction]}")
+        if not 1 <= bits_per_step <= 31:
+            raise ValueError("Число бит за шаг должно быть от 1 до 31")
+        self.extraction = extraction
+        self.bits_per_step = bits_per_step
     # Генерация следующего псевдослучайного числа
     def next(self):
         self.state = (self.a * self.state) % self.m
@@ -21,8 +78,63 @@ class ParkMillerGenerator:
     # Возвращает случайное число в диапазоне 0, 1
     def random(self):
         return self.next() / self.m
+    # Значение из bits_per_step бит, извлекаемое из состояния выбранным режимом
+    def _extract(self, state):
+        if self.extraction == 'lsb':
+            return state & 1
+        if self.extraction == 'all':
+            return state
+        if self.extraction == 'top':
+            return state >> (31 - self.bits_per_step)
+        # floor(random() * 2^k) в целых числах, без ошибок округления
+        return (state << self.bits_per_step) // self.m
+    # Переход на k шагов вперёд за O(log k): x_(i+k) = a^k * x_i mod m
+    def jump(self, k):
+        self.state = pow(self.a, k, self.m) * self.state % self.m
+        return self.state
+    # Разбиение следующих n шагов потока на n_workers непрерывных участков.
+    # Возвращает пары (генератор, длина); все участки, кроме последнего, кратны
+    # 8 битам, поэтому упакованные результаты склеиваются побайтно.
+    # При n = 0 участков нет. Состояние самого генератора не меняется
+    def split(self, n_workers, n):
+        if n_workers < 1:
+            raise ValueError("Число участков должно быть не меньше 1")
+        if n <= 0:
+            return []
+        size = -(-n // n_workers)
+        size = -(-size // 8) * 8
+        stride = pow(self.a, size, self.m)
+        parts = []
+        state = self.state
+        for start in range(0, n, size):
+            parts.append((ParkMillerGenerator(state, self.extraction, self.bits_per_step), min(size, n - start)))
+            state = stride * state % self.m
+        return parts
     # Генерация последовательности битов заданной длины
-    def random_bits(self, n):
+    # packed=True возвращает упакованную BitSequence вместо строки.
+    # За шаг извлекается bits_per_step бит; неиспользованные биты последнего шага
+    # отбрасываются. При workers > 1 участки потока генерируются в пуле процессов;
+    # результат и конечное состояние совпадают с последовательной генерацией
+    def random_bits(self, n, packed=False, workers=None):
+        k = self.bits_per_step
+        steps = -(-n // k)
+        if workers and workers > 1 and n > 0:
+            parts = self.split(workers, steps)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                data = b''.join(pool.map(_park_miller_slice, [g.state for g, _ in parts],
+                                         [length * k for _, length in parts],
+                                         [self.extraction] * len(parts), [k] * len(parts)))
+            self.jump(steps)
+            bits = BitSequence(data, n)
+            return bits if packed else bits.to_str()
+        if np is not None and n > 0:
+            bits = self._leapfrog_bits(n)
+            return bits if packed else bits.to_str()
+        if self.extraction != 'lsb':
+            text = ''.join(format(self._extract(self.next()), f'0{k}b') for _ in range(steps))[:n]
+            return BitSequence.from_str(text) if packed else text
+        if packed:
+            return BitSequence.from_bits(self.next() & 1 for _ in range(n))
         bits = []
         for _ in range(n):
             # Берем младший бит от сгенерированного числа
@@ -30,10 +142,58 @@ class ParkMillerGenerator:
             bits.append(str(bit))
         return ''.join(bits)
 
+    # Пакетная генерация n бит из следующих состояний средствами NumPy.
+    # Вектор из W соседних состояний x_(i+1)..x_(i+W) переводится в x_(i+W+1)..x_(i+2W)
+    # одним умножением на a^W mod m (произведение меньше 2^62 и помещается в uint64),
+    # строки таких векторов идут в потоке подряд и сразу упаковываются в байты
+    def _leapfrog_bits(self, n):
+        k = self.bits_per_step
+        steps = -(-n // k)
+        width = min(_LEAPFROG_WIDTH, -(-steps // 8) * 8)
+        m = np.uint64(self.m)
+        # Степени a^1..a^W удвоением: [a^1..a^k] -> [a^1..a^2k]
+        powers = np.array([self.a], dtype=np.uint64)
+        while len(powers) < width:
+            powers = np.concatenate((powers, powers * np.uint64(pow(self.a, len(powers), self.m)) % m))
+        stride = np.uint64(pow(self.a, width, self.m))
+
+        rows_total = -(-steps // width)
+        row_bytes = width * k // 8
+        # Порция из block_rows строк занимает не больше памяти, чем при одном бите за шаг
+        block_rows = max(1, _LEAPFROG_ROWS // k)
+        out = bytearray(-(-n // 8))
+        block = np.empty((block_rows, width), dtype=np.uint64)
+        previous = powers[:width] * np.uint64(self.state) % m
+        for first in range(0, rows_total, block_rows):
+            rows = min(block_rows, rows_total - first)
+            block[0] = previous
+            for row in range(1, rows):
+                np.multiply(block[row - 1], stride, out=block[row])
+                np.remainder(block[row], m, out=block[row])
+            previous = block[rows - 1] * stride % m
+            packed = _pack_values(self._leapfrog_values(block[:rows], m), k)
+            start = first * row_bytes
+            stop = min(len(out), start + rows * row_bytes)
+            out[start:stop] = packed[:stop - start].tobytes()
+        self.jump(steps)
+        return BitSequence(out, n)
+
+    # Извлечение битов из массива состояний (как _extract, с явными типами uint64)
+    def _leapfrog_values(self, states, m):
+        if self.extraction == 'lsb':
+            return states & np.uint64(1)
+        if self.extraction == 'all':
+            return states
+        if self.extraction == 'top':
+            return states >> np.uint64(31 - self.bits_per_step)
+        return (states << np.uint64(self.bits_per_step)) // m
+
 # Генератор Blum-Blum-Shub (BBS)
 class BBSGenerator:
-    # Инициализация генератора BBS
-    def __init__(self, seed=None):
+    # Инициализация генератора BBS.
+    # bits_per_step - число младших бит, выдаваемых за одно возведение в квадрат;
+    # не больше log2(log2 n), при котором генератор остаётся доказуемо стойким
+    def __init__(self, seed=None, bits_per_step=1):
         # Два простых числа, удовлетворяющих условию p ≡ 3 mod 4
         self.p = 30000000091  # Простое число, p ≡ 3 mod 4
         self.q = 40000000003  # Простое число, q ≡ 3 mod 4
@@ -53,6 +213,14 @@ class BBSGenerator:
             self.state = (self.state + 1) % self.n
             if self.state == 0:
                 self.state = 1
+
+        limit = self.max_bits_per_step()
+        if not 1 <= bits_per_step <= limit:
+            raise ValueError(f"Число бит за шаг должно быть от 1 до {limit}")
+        self.bits_per_step = bits_per_step
+    # Наибольшее число бит за шаг: floor(log2(log2 n)), для текущего модуля - 6
+    def max_bits_per_step(self):
+        return int(math.log2(math.log2(self.n)))
     # Генерация следующего бита
     def next_bit(self):
         # x_i = (x_{i-1})^2 mod n
@@ -60,9 +228,51 @@ class BBSGenerator:
 
         # Возвращаем младший бит
         return self.state & 1
+    # Генерация следующих bits_per_step бит одним возведением в квадрат
+    def next_bits(self):
+        self.state = pow(self.state, 2, self.n)
+        return self.state & ((1 << self.bits_per_step) - 1)
     # Генерация последовательности битов заданной длины
-    def random_bits(self, n):
-        bits = []
-        for _ in range(n):
-            bits.append(str(self.next_bit()))
-        return ''.join(bits)
+    # packed=True возвращает упакованную BitSequence вместо строки.
+    # За шаг выдаются bits_per_step младших бит (старший из них первым);
+    # неиспользованные биты последнего шага отбрасываются
+    def random_bits(self, n, packed=False):
+        k = self.bits_per_step
+        mask = (1 << k) - 1
+        modulus = self.n
+        state = self.state
+        steps = -(-n // k)
+        # Биты _BBS_BATCH шагов накапливаются в целом числе; длина порции кратна
+        # 8 битам, поэтому упакованные порции склеиваются побайтно
+        parts = []
+        for first in range(0, steps, _BBS_BATCH):
+            count = min(_BBS_BATCH, steps - first)
+            value = 0
+            for _ in range(count):
+                state = state * state % modulus
+                value = (value << k) | (state & mask)
+            parts.append(BitSequence.from_int(value, count * k).to_bytes())
+        self.state = state
+        bits = BitSequence(b''.join(parts), n)
+        return bits if packed else bits.to_str()
+
+
+# Сравнение скорости генераторов (бит в секунду) для всех режимов
+def benchmark(n=1 << 20):
+    results = []
+    for extraction, default in EXTRACTION_MODES.items():
+        generator = ParkMillerGenerator(12345, extraction)
+        start = time.perf_counter()
+        generator.random_bits(n * 8, packed=True)
+        results.append((f"Парк-Миллер, {extraction} ({default} бит/шаг)", n * 8 / (time.perf_counter() - start)))
+    for bits_per_step in range(1, BBSGenerator().max_bits_per_step() + 1):
+        generator = BBSGenerator(12345, bits_per_step)
+        start = time.perf_counter()
+        generator.random_bits(n // 8, packed=True)
+        results.append((f"BBS, {bits_per_step} бит/шаг", n // 8 / (time.perf_counter() - start)))
+    return results
+
+
+if __name__ == "__main__":
+    for title, speed in benchmark():
+        print(f"{title:<35} {speed / 1e6:10.3f} Мбит/с")
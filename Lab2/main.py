@@ -3,8 +3,12 @@ from tkinter import scrolledtext, messagebox, filedialog, ttk
 import secrets
 import os
 import sys
+import multiprocessing
 import tests
+import entropy
+import sweep
 import generators  # Импортируем новый модуль с генераторами
+from bitsequence import BitSequence
 
 
 # Получение абсолютного пути к ресурсу для PyInstaller
@@ -25,7 +29,7 @@ class GenerateApp:
         self.center_window()
 
         # Переменные
-        self.sequence = ""  # Здесь будет храниться полная последовательность
+        self.sequence = BitSequence()  # Здесь будет храниться полная последовательность (упакованная)
         self.full_sequence_displayed = False  # Флаг, показываем ли всю последовательность
         self.preview_length = 100  # Количество бит для предпросмотра в начале и в конце
         self.current_file = None  # Текущий открытый файл
@@ -100,6 +104,15 @@ class GenerateApp:
         self.seed_entry.pack(side=tk.LEFT)
         self.seed_entry.insert(0, "12345")
 
+        # Кнопка проверки seed: в поле можно указать список и диапазоны, например "1-5000"
+        self.sweep_btn = tk.Button(
+            self.pm_params_frame,
+            text="Проверить seed",
+            command=self.run_seed_sweep,
+            font=("Arial", 9)
+        )
+        self.sweep_btn.pack(side=tk.LEFT, padx=(5, 0))
+
         # Фрейм для ввода длины
         length_frame = tk.Frame(self.root)
         length_frame.pack(pady=10)
@@ -292,6 +305,48 @@ class GenerateApp:
         )
         self.runs_test_btn.pack(side=tk.LEFT, padx=5)
 
+        # Кнопка запуска всех тестов за один проход
+        self.battery_btn = tk.Button(
+            test_frame,
+            text="Все тесты",
+            command=self.run_all_tests,
+            bg="#009688",  # Бирюзовый
+            fg="white",
+            font=("Arial", 10),
+            padx=10,
+            pady=5,
+            state=tk.DISABLED  # Изначально неактивна
+        )
+        self.battery_btn.pack(side=tk.LEFT, padx=5)
+
+        # Кнопка быстрой проверки FIPS 140-2 по блокам из 20 000 бит
+        self.fips_btn = tk.Button(
+            test_frame,
+            text="FIPS 140-2",
+            command=self.run_fips_test,
+            bg="#3F51B5",  # Индиго
+            fg="white",
+            font=("Arial", 10),
+            padx=10,
+            pady=5,
+            state=tk.DISABLED  # Изначально неактивна
+        )
+        self.fips_btn.pack(side=tk.LEFT, padx=5)
+
+        # Кнопка оценки минимальной энтропии по NIST SP 800-90B
+        self.entropy_btn = tk.Button(
+            test_frame,
+            text="Оценка энтропии",
+            command=self.run_entropy_estimate,
+            bg="#8BC34A",  # Светло-зелёный
+            fg="white",
+            font=("Arial", 10),
+            padx=10,
+            pady=5,
+            state=tk.DISABLED  # Изначально неактивна
+        )
+        self.entropy_btn.pack(side=tk.LEFT, padx=5)
+
         # Кнопка очистки результатов тестов
         self.clear_tests_btn = tk.Button(
             test_frame,
@@ -305,6 +360,46 @@ class GenerateApp:
         )
         self.clear_tests_btn.pack(side=tk.LEFT, padx=5)
 
+        # Фрейм для дополнительных тестов из батареи
+        extra_frame = tk.Frame(self.root)
+        extra_frame.pack(pady=5)
+
+        tk.Label(
+            extra_frame,
+            text="Дополнительные тесты:",
+            font=("Arial", 10)
+        ).pack(side=tk.LEFT, padx=5)
+
+        # Выпадающий список тестов, у которых нет отдельной кнопки
+        self.extra_tests = {
+            title: name for name, (title, _, _) in tests.BATTERY_TESTS.items()
+            if name not in ('frequency', 'runs')
+        }
+        self.extra_test_var = tk.StringVar(value=next(iter(self.extra_tests)))
+        self.extra_test_combo = ttk.Combobox(
+            extra_frame,
+            textvariable=self.extra_test_var,
+            values=list(self.extra_tests),
+            state="readonly",
+            width=40,
+            font=("Arial", 10)
+        )
+        self.extra_test_combo.pack(side=tk.LEFT, padx=5)
+
+        # Кнопка запуска выбранного теста
+        self.extra_test_btn = tk.Button(
+            extra_frame,
+            text="Выполнить",
+            command=self.run_extra_test,
+            bg="#607D8B",  # Серо-синий
+            fg="white",
+            font=("Arial", 10),
+            padx=10,
+            pady=5,
+            state=tk.DISABLED  # Изначально неактивна
+        )
+        self.extra_test_btn.pack(side=tk.LEFT, padx=5)
+
         # Фрейм для отображения результатов тестов
         results_frame = tk.Frame(self.root)
         results_frame.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
@@ -341,6 +436,7 @@ class GenerateApp:
         # Добавляем теги для цветового форматирования результатов тестов
         self.results_text.tag_config("passed", foreground="green", font=("Courier", 9, "bold"))
         self.results_text.tag_config("failed", foreground="red", font=("Courier", 9, "bold"))
+        self.results_text.tag_config("skipped", foreground="gray", font=("Courier", 9, "bold"))
 
     # Обработчик изменения выбора генератора
     def on_generator_changed(self, event=None):
@@ -382,7 +478,7 @@ class GenerateApp:
             # Выбор генератора на основе пользовательского выбора
             if generator_type == "Стандартный генератор":
                 # Использование существующего генератора из ЛР1
-                self.sequence = ''.join(str(secrets.randbits(1)) for _ in range(length))
+                self.sequence = BitSequence.from_int(secrets.randbits(length), length)
                 generator_info = "Стандартный"
 
             elif generator_type == "Генератор Парка-Миллера":
@@ -390,7 +486,7 @@ class GenerateApp:
                 try:
                     seed = int(self.seed_entry.get())
                     pm = generators.ParkMillerGenerator(seed)
-                    self.sequence = pm.random_bits(length)
+                    self.sequence = pm.random_bits(length, packed=True)
                     generator_info = f"Парка-Миллера (seed={seed})"
                 except ValueError:
                     messagebox.showerror("Ошибка", "Начальное значение должно быть целым числом!")
@@ -399,7 +495,7 @@ class GenerateApp:
             elif generator_type == "Генератор BBS":
                 # Использование генератора BBS
                 bbs = generators.BBSGenerator()
-                self.sequence = bbs.random_bits(length)
+                self.sequence = bbs.random_bits(length, packed=True)
                 generator_info = "BBS"
             else:
                 messagebox.showerror("Ошибка", "Неизвестный тип генератора!")
@@ -471,7 +567,7 @@ class GenerateApp:
                 return
 
             # Сохраняем последовательность
-            self.sequence = cleaned_content
+            self.sequence = BitSequence.from_str(cleaned_content)
             self.current_file = filepath
             # Отображаем
             self.update_display()
@@ -547,9 +643,11 @@ class GenerateApp:
             if not filepath:  # Пользователь отменил
                 return
 
-            # Сохраняем в файл
+            # Сохраняем в файл частями, чтобы не разворачивать всю последовательность в строку
+            chunk = 8 * 1024 * 1024
             with open(filepath, 'w', encoding='utf-8') as file:
-                file.write(self.sequence)
+                for start in range(0, len(self.sequence), chunk):
+                    file.write(self.sequence[start:start + chunk].to_str())
 
             self.current_file = filepath
             filename = os.path.basename(filepath)
@@ -574,18 +672,18 @@ class GenerateApp:
             # Показываем только начало и конец для длинных последовательностей
             if len(self.sequence) > (2 * self.preview_length):
                 preview = (
-                        self.sequence[:self.preview_length] +
+                        self.sequence[:self.preview_length].to_str() +
                         "\n... [пропущено " +
                         str(len(self.sequence) - 2 * self.preview_length) +
                         " бит] ...\n" +
-                        self.sequence[-self.preview_length:]
+                        self.sequence[-self.preview_length:].to_str()
                 )
                 self.full_sequence_displayed = False
             else:
-                preview = self.sequence
+                preview = self.sequence.to_str()
                 self.full_sequence_displayed = True
         else:  # full mode
-            preview = self.sequence
+            preview = self.sequence.to_str()
             self.full_sequence_displayed = True
 
         # Обновляем текстовое поле
@@ -601,7 +699,7 @@ class GenerateApp:
 
     # Очистка текстового поля и сброс последовательности
     def clear_display(self):
-        self.sequence = ""
+        self.sequence = BitSequence()
         self.current_file = None
         self.text_area.delete(1.0, tk.END)
         self.info_label.config(text="Последовательность не сгенерирована", fg="blue")
@@ -626,6 +724,10 @@ class GenerateApp:
         state = tk.NORMAL if enable else tk.DISABLED
         self.freq_test_btn.config(state=state)
         self.runs_test_btn.config(state=state)  # Добавили управление новой кнопкой
+        self.battery_btn.config(state=state)
+        self.fips_btn.config(state=state)
+        self.entropy_btn.config(state=state)
+        self.extra_test_btn.config(state=state)
 
     # Выполнение частотного теста
     def run_frequency_test(self):
@@ -679,26 +781,184 @@ class GenerateApp:
             messagebox.showerror("Ошибка", f"Ошибка при выполнении теста: {str(e)}")
             self.status_label.config(text="Ошибка при выполнении теста", fg="red")
 
+    # Выполнение теста, выбранного в списке дополнительных тестов
+    def run_extra_test(self):
+        if not self.sequence:
+            messagebox.showwarning("Предупреждение", "Нет последовательности для тестирования!")
+            return
+        title = self.extra_test_var.get()
+        try:
+            # Обновляем статус
+            self.status_label.config(text=f"Выполняется: {title}...", fg="orange")
+            self.root.update()
+
+            # Выполняем тест
+            result = tests.run_battery(self.sequence, [self.extra_tests[title]])[self.extra_tests[title]]
+
+            # Отображаем результаты
+            self.display_test_result(result, title)
+
+            # Обновляем статус
+            if result.get('not_applicable'):
+                self.status_label.config(text=f"{title}: неприменим", fg="gray")
+            else:
+                status_color = "green" if result['passed'] else "red"
+                status_text = f"{title}: пройден" if result['passed'] else f"{title}: не пройден"
+                self.status_label.config(text=status_text, fg=status_color)
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка при выполнении теста: {str(e)}")
+            self.status_label.config(text="Ошибка при выполнении теста", fg="red")
+
+    # Выполнение всех тестов батареи с однократным сбором статистики
+    def run_all_tests(self):
+        if not self.sequence:
+            messagebox.showwarning("Предупреждение", "Нет последовательности для тестирования!")
+            return
+        try:
+            # Обновляем статус
+            self.status_label.config(text="Выполняются все тесты...", fg="orange")
+            self.root.update()
+
+            # Выполняем тесты
+            results = tests.run_battery(self.sequence)
+
+            # Отображаем результаты
+            for name, result in results.items():
+                self.display_test_result(result, tests.BATTERY_TESTS[name][0])
+
+            # Обновляем статус (неприменимые тесты не считаются отказами)
+            applicable = [result for result in results.values() if not result.get('not_applicable')]
+            failed = [result for result in applicable if not result['passed']]
+            skipped = len(results) - len(applicable)
+            note = f", неприменимо: {skipped}" if skipped else ""
+            if failed:
+                self.status_label.config(
+                    text=f"Не пройдено тестов: {len(failed)} из {len(applicable)}{note}", fg="red")
+            else:
+                self.status_label.config(text=f"Все применимые тесты пройдены{note}", fg="green")
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка при выполнении теста: {str(e)}")
+            self.status_label.config(text="Ошибка при выполнении теста", fg="red")
+
+    # Быстрая проверка FIPS 140-2 по всем 20 000-битным блокам последовательности
+    def run_fips_test(self):
+        if not self.sequence:
+            messagebox.showwarning("Предупреждение", "Нет последовательности для тестирования!")
+            return
+        try:
+            # Обновляем статус
+            self.status_label.config(text="Выполняется проверка FIPS 140-2...", fg="orange")
+            self.root.update()
+
+            # Выполняем проверку
+            result = tests.fips_battery(self.sequence)
+
+            # Отображаем результаты
+            self.display_test_result(result, "Проверка FIPS 140-2")
+
+            # Обновляем статус
+            if result['passed']:
+                self.status_label.config(text="FIPS 140-2: все блоки пройдены", fg="green")
+            elif 'block_passed' not in result:
+                # Проверка не выполнялась (например, последовательность короче блока)
+                self.status_label.config(text=f"FIPS 140-2: {result['description']}", fg="red")
+            else:
+                self.status_label.config(text="FIPS 140-2: не пройдена", fg="red")
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка при выполнении теста: {str(e)}")
+            self.status_label.config(text="Ошибка при выполнении теста", fg="red")
+
+    # Проверка набора seed генератора Парка-Миллера по длине из поля ввода длины
+    def run_seed_sweep(self):
+        try:
+            seeds = sweep.parse_seeds(self.seed_entry.get())
+            length = int(self.length_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"Некорректные параметры проверки seed: {str(e)}")
+            return
+        try:
+            # Обновляем статус
+            self.status_label.config(text=f"Проверка {len(seeds)} seed...", fg="orange")
+            self.root.update()
+
+            # Выполняем проверку
+            result = sweep.sweep_seeds(seeds, length)
+
+            # Отображаем таблицу seed
+            self.results_text.config(state=tk.NORMAL)
+            separator = "=" * 80
+            self.results_text.insert(tk.END, f"\n{separator}\n{result['description']}\n")
+            self.results_text.see(tk.END)
+            self.results_text.config(state=tk.DISABLED)
+
+            # Обновляем статус
+            self.status_label.config(
+                text=f"Проверено seed: {len(seeds)}, не прошли: {result['statistic']}",
+                fg="green" if result['passed'] else "red")
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка при проверке seed: {str(e)}")
+            self.status_label.config(text="Ошибка при проверке seed", fg="red")
+
+    # Оценка минимальной энтропии последовательности (NIST SP 800-90B)
+    def run_entropy_estimate(self):
+        if not self.sequence:
+            messagebox.showwarning("Предупреждение", "Нет последовательности для оценки!")
+            return
+        try:
+            # Обновляем статус
+            self.status_label.config(text="Выполняется оценка энтропии...", fg="orange")
+            self.root.update()
+
+            # Выполняем оценку
+            result = entropy.estimate_min_entropy(self.sequence)
+
+            # Отображаем результаты (без отметки о прохождении)
+            self.results_text.config(state=tk.NORMAL)
+            separator = "=" * 80
+            self.results_text.insert(tk.END, f"\n{separator}\n{result['description']}\n")
+            self.results_text.see(tk.END)
+            self.results_text.config(state=tk.DISABLED)
+
+            # Обновляем статус
+            self.status_label.config(
+                text=f"Минимальная энтропия: {result['min_entropy']:.4f} бит на бит", fg="green")
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка при оценке энтропии: {str(e)}")
+            self.status_label.config(text="Ошибка при оценке энтропии", fg="red")
+
     # Отображение результатов теста в текстовом поле
     def display_test_result(self, result, test_name):
         self.results_text.config(state=tk.NORMAL)
 
         # Добавляем разделитель и заголовок с результатом
         separator = "=" * 80
-        test_result = "ПРОЙДЕН" if result['passed'] else "НЕ ПРОЙДЕН"
+        if result.get('not_applicable'):
+            test_result = "неприменим"
+        else:
+            test_result = "ПРОЙДЕН" if result['passed'] else "НЕ ПРОЙДЕН"
         header = f"\n{separator}\n{test_name}: {test_result}\n{separator}\n"
 
         self.results_text.insert(tk.END, header)
 
         # Вставляем описание теста (без первой строки, которая уже есть в заголовке)
         description_lines = result['description'].split('\n')
-        # Пропускаем первую строку (она уже в заголовке) и объединяем остальные
+        # Пропускаем первую строку (она уже в заголовке) и объединяем остальные;
+        # однострочное описание (ошибка или неприменимость) - единственное объяснение итога
         if len(description_lines) > 1:
             detailed_description = '\n'.join(description_lines[1:])
             self.results_text.insert(tk.END, detailed_description + "\n")
+        else:
+            self.results_text.insert(tk.END, result['description'] + "\n")
 
         # Добавляем цветовое выделение
-        if result['passed']:
+        if result.get('not_applicable'):
+            self.results_text.insert(tk.END, "– Тест неприменим к этой последовательности\n", "skipped")
+        elif result['passed']:
             self.results_text.insert(tk.END, "✓ Тест ПРОЙДЕН успешно\n", "passed")
         else:
             self.results_text.insert(tk.END, "✗ Тест НЕ ПРОЙДЕН\n", "failed")
@@ -722,4 +982,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Нужно для пулов процессов в собранном PyInstaller исполняемом файле
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,366 @@
+# Непрерывный контроль живого источника битов: тесты работоспособности
+# NIST SP 800-90B (4.4.1 - повторения, 4.4.2 - адаптивная пропорция) и скользящие
+# частотный тест и тест на одинаковые биты по последним N битам.
+# Память постоянна (кольцевой буфер окна), обработка каждого бита - O(1)
+import argparse
+import math
+import os
+import re
+import stat
+import sys
+import time
+from bitsequence import BitSequence
+import tests
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy порции обрабатываются побитно
+    np = None
+
+# Вероятность ложной тревоги тестов работоспособности (SP 800-90B: от 2^-20 до 2^-40)
+HEALTH_ALPHA = 2 ** -20
+
+# Размер окна адаптивного теста пропорции для двоичного источника
+APT_WINDOW = 1024
+
+# Длина скользящего окна частотного теста и теста на одинаковые биты (бит)
+ROLLING_WINDOW = 1 << 16
+
+# Уровень значимости скользящих тестов: окна перекрываются и проверяются часто,
+# поэтому он намного строже, чем у разовой проверки
+ROLLING_ALPHA = 1e-6
+
+# Всё, кроме 0 и 1, в текстовых источниках пропускается
+_NOT_BITS = re.compile(rb'[^01]')
+
+# Размер порции чтения источника (байт)
+_READ_SIZE = 1 << 16
+
+
+# Порог теста повторений: C = 1 + ⌈-log2(alpha) / H⌉
+def repetition_cutoff(min_entropy: float = 1.0, alpha: float = HEALTH_ALPHA) -> int:
+    return 1 + math.ceil(-math.log2(alpha) / min_entropy)
+
+
+# Порог адаптивного теста пропорции: C = 1 + CRITBINOM(W, 2^-H, 1 - alpha),
+# где CRITBINOM - наименьшее k, для которого P(X ≤ k) ≥ 1 - alpha при X ~ B(W, 2^-H)
+def proportion_cutoff(min_entropy: float = 1.0, window: int = APT_WINDOW, alpha: float = HEALTH_ALPHA) -> int:
+    p = 2 ** -min_entropy
+    if p >= 1:
+        return window
+    tail = 0.0
+    for k in range(window, -1, -1):
+        term = math.exp(math.lgamma(window + 1) - math.lgamma(k + 1) - math.lgamma(window - k + 1) +
+                        k * math.log(p) + (window - k) * math.log1p(-p))
+        if tail + term > alpha:
+            return k + 1
+        tail += term
+    return 1
+
+
+# Тревога теста: имя теста, номер бита (с нуля), на котором сработал тест, и пояснение
+def _alarm(test: str, sample: int, message: str) -> dict:
+    return {'test': test, 'sample': sample, 'description': message}
+
+
+# Монитор источника: состояние тестов переносится между порциями, а скользящие
+# проверки привязаны к номерам битов, поэтому результат не зависит от того,
+# как поток разбит на порции
+class HealthMonitor:
+    def __init__(self, min_entropy: float = 1.0, alpha: float = HEALTH_ALPHA, window: int = ROLLING_WINDOW,
+                 rolling_alpha: float = ROLLING_ALPHA, rolling_step: int = None):
+        self.rct_cutoff = repetition_cutoff(min_entropy, alpha)
+        self.apt_cutoff = proportion_cutoff(min_entropy, APT_WINDOW, alpha)
+        self.samples = 0
+        self.alarm_counts = {'repetition_count': 0, 'adaptive_proportion': 0, 'frequency': 0, 'runs': 0}
+
+        # Тест повторений: последнее значение и длина текущей серии
+        self.last = None
+        self.run = 0
+
+        # Адаптивный тест пропорции: первое значение окна, число совпадений, заполнение окна
+        self.apt_first = None
+        self.apt_count = 0
+        self.apt_seen = 0
+
+        # Скользящее окно: кольцевой буфер, самый старый бит - в позиции start
+        self.window = window
+        self.ring = np.zeros(window, dtype=np.uint8) if np is not None else bytearray(window)
+        self.start = 0
+        self.filled = 0
+        self.ones = 0
+        self.transitions = 0
+        self.rolling_alpha = rolling_alpha
+        self.rolling_step = rolling_step or max(1, window // 4)
+        self.next_check = window
+
+    # Обработка очередной порции; возвращает список новых тревог.
+    # Порция делится на части по границам скользящих проверок, поэтому окно
+    # проверяется ровно каждые rolling_step бит при любом размере порций
+    def update(self, chunk) -> list:
+        chunk = BitSequence.coerce(chunk)
+        if not chunk:
+            return []
+        x = chunk.unpack() if np is not None else list(chunk)
+        alarms = []
+        start = 0
+        while start < len(x):
+            stop = min(len(x), start + self.next_check - self.samples)
+            piece = x[start:stop]
+            if np is None:
+                for bit in piece:
+                    alarms.extend(self._update_bit(bit))
+            else:
+                alarms.extend(self._repetition(piece) + self._proportion(piece))
+                self._roll(piece)
+                self.samples += len(piece)
+            if self.samples == self.next_check:
+                if self.filled == self.window:
+                    alarms.extend(self._check_window())
+                self.next_check += self.rolling_step
+            start = stop
+        alarms.sort(key=lambda alarm: alarm['sample'])
+        for alarm in alarms:
+            self.alarm_counts[alarm['test']] += 1
+        return alarms
+
+    # Обработка одного бита без NumPy
+    def _update_bit(self, bit: int) -> list:
+        alarms = []
+        index = self.samples
+        if bit == self.last:
+            self.run += 1
+            if self.run == self.rct_cutoff:
+                alarms.append(self._repetition_alarm(index))
+        else:
+            self.last = bit
+            self.run = 1
+
+        if self.apt_seen == 0:
+            self.apt_first = bit
+            self.apt_count = 1
+        elif bit == self.apt_first:
+            self.apt_count += 1
+            if self.apt_count == self.apt_cutoff:
+                alarms.append(self._proportion_alarm(index))
+        self.apt_seen = (self.apt_seen + 1) % APT_WINDOW
+
+        if self.filled == self.window:
+            oldest = self.ring[self.start]
+            following = self.ring[(self.start + 1) % self.window]
+            self.ones -= oldest
+            self.transitions -= oldest != following
+            self.start = (self.start + 1) % self.window
+            self.filled -= 1
+        if self.filled:
+            self.transitions += bit != self.ring[(self.start + self.filled - 1) % self.window]
+        self.ring[(self.start + self.filled) % self.window] = bit
+        self.filled += 1
+        self.ones += bit
+        self.samples += 1
+        return alarms
+
+    def _repetition_alarm(self, index: int) -> dict:
+        return _alarm('repetition_count', index,
+                      f'серия из {self.rct_cutoff} одинаковых битов ({self.last}), порог C = {self.rct_cutoff}')
+
+    def _proportion_alarm(self, index: int) -> dict:
+        return _alarm('adaptive_proportion', index,
+                      f'значение {self.apt_first} встретилось {self.apt_cutoff} раз в окне из {APT_WINDOW} бит')
+
+    # Тест повторений по порции: серии ищутся по сменам значения, первая серия
+    # продолжает серию, начатую в предыдущей порции
+    def _repetition(self, x) -> list:
+        n = len(x)
+        starts = np.concatenate(([0], np.flatnonzero(x[1:] != x[:-1]) + 1))
+        lengths = np.diff(np.append(starts, n))
+        carried = self.run if self.last == x[0] else 0
+        totals = lengths.copy()
+        totals[0] += carried
+        alarms = []
+        for k in np.flatnonzero(totals >= self.rct_cutoff):
+            # Серия, уже дошедшая до порога в прошлой порции, повторно не сообщается
+            if k == 0 and carried >= self.rct_cutoff:
+                continue
+            self.last = int(x[starts[k]])
+            alarms.append(self._repetition_alarm(self.samples + int(starts[k]) - (carried if k == 0 else 0) +
+                                                 self.rct_cutoff - 1))
+        self.last = int(x[-1])
+        self.run = int(totals[-1]) if len(totals) > 1 else int(totals[0])
+        return alarms
+
+    # Адаптивный тест пропорции по порции: незаконченное окно дополняется,
+    # полные окна обрабатываются как строки двумерного массива
+    def _proportion(self, x) -> list:
+        alarms = []
+        offset = 0
+        n = len(x)
+        if self.apt_seen:
+            take = min(n, APT_WINDOW - self.apt_seen)
+            matches = np.cumsum(x[:take] == self.apt_first) + self.apt_count
+            if self.apt_count < self.apt_cutoff and matches[-1] >= self.apt_cutoff:
+                position = int(np.argmax(matches >= self.apt_cutoff))
+                alarms.append(self._proportion_alarm(self.samples + position))
+            self.apt_count = int(matches[-1])
+            self.apt_seen = (self.apt_seen + take) % APT_WINDOW
+            offset = take
+        rows = (n - offset) // APT_WINDOW
+        if rows:
+            block = x[offset:offset + rows * APT_WINDOW].reshape(rows, APT_WINDOW)
+            matches = np.cumsum(block == block[:, :1], axis=1)
+            for row in np.flatnonzero(matches[:, -1] >= self.apt_cutoff):
+                position = int(np.argmax(matches[row] >= self.apt_cutoff))
+                self.apt_first = int(block[row, 0])
+                alarms.append(self._proportion_alarm(self.samples + offset + int(row) * APT_WINDOW + position))
+            offset += rows * APT_WINDOW
+        if offset < n:
+            rest = x[offset:]
+            self.apt_first = int(rest[0])
+            self.apt_count = int(np.count_nonzero(rest == rest[0]))
+            self.apt_seen = len(rest)
+            if self.apt_count >= self.apt_cutoff:
+                position = int(np.argmax(np.cumsum(rest == rest[0]) >= self.apt_cutoff))
+                alarms.append(self._proportion_alarm(self.samples + offset + position))
+        return alarms
+
+    # Биты кольцевого буфера с позиции start (по кругу), count штук
+    def _ring_slice(self, start: int, count: int):
+        stop = start + count
+        if stop <= self.window:
+            return self.ring[start:stop]
+        return np.concatenate((self.ring[start:], self.ring[:stop - self.window]))
+
+    # Сдвиг скользящего окна на порцию x: вытесняемые биты вычитаются из числа
+    # единиц и смен, новые добавляются
+    def _roll(self, x):
+        if len(x) >= self.window:
+            self.ring[:] = x[-self.window:]
+            self.start = 0
+            self.filled = self.window
+            self.ones = int(np.count_nonzero(self.ring))
+            self.transitions = int(np.count_nonzero(self.ring[1:] != self.ring[:-1]))
+            return
+        evicted = max(0, self.filled + len(x) - self.window)
+        if evicted:
+            old = self._ring_slice(self.start, evicted + 1)
+            self.ones -= int(np.count_nonzero(old[:-1]))
+            self.transitions -= int(np.count_nonzero(old[1:] != old[:-1]))
+            self.start = (self.start + evicted) % self.window
+            self.filled -= evicted
+        if self.filled:
+            newest = self.ring[(self.start + self.filled - 1) % self.window]
+            self.transitions += int(newest != x[0])
+        self.transitions += int(np.count_nonzero(x[1:] != x[:-1]))
+        self.ones += int(np.count_nonzero(x))
+        position = (self.start + self.filled) % self.window
+        head = min(len(x), self.window - position)
+        self.ring[position:position + head] = x[:head]
+        self.ring[:len(x) - head] = x[head:]
+        self.filled += len(x)
+
+    # Частотный тест и тест на одинаковые биты по текущему окну (формулы tests.py)
+    def rolling_results(self) -> dict:
+        stats = {
+            'bits': None,
+            'n': self.filled,
+            'ones': self.ones,
+            'zeros': self.filled - self.ones,
+            'transitions': self.transitions
+        }
+        return {
+            'frequency': tests._frequency_from_stats(stats, self.rolling_alpha),
+            'runs': tests._runs_from_stats(stats, self.rolling_alpha)
+        }
+
+    def _check_window(self) -> list:
+        alarms = []
+        for name, result in self.rolling_results().items():
+            if not result['passed']:
+                alarms.append(_alarm(name, self.samples - 1,
+                                     f'окно из {self.filled} бит: P-значение {result["p_value"]:.3g} < {self.rolling_alpha}'))
+        return alarms
+
+
+# Чтение порций битов из источника: путь к файлу или устройству, '-' - стандартный ввод.
+# binary=None выбирает двоичный режим (8 бит в байте) для символьных устройств
+# (/dev/urandom) и текстовый (символы 0 и 1) для файлов и каналов.
+# follow=True продолжает ждать данных в конце файла, как tail -f
+def iter_source(path: str, binary: bool = None, follow: bool = False, read_size: int = _READ_SIZE,
+                poll: float = 0.1):
+    if path == '-':
+        stream = sys.stdin.buffer
+        read = stream.read1
+        close = False
+    else:
+        stream = open(path, 'rb', buffering=0)
+        read = stream.read
+        close = True
+    if binary is None:
+        binary = stat.S_ISCHR(os.fstat(stream.fileno()).st_mode)
+    try:
+        while True:
+            data = read(read_size)
+            if not data:
+                if not follow:
+                    break
+                time.sleep(poll)
+                continue
+            if binary:
+                yield BitSequence(data)
+            else:
+                text = _NOT_BITS.sub(b'', data).decode('ascii')
+                if text:
+                    yield BitSequence.from_str(text)
+    finally:
+        if close:
+            stream.close()
+
+
+# Запуск монитора над источником; limit - наибольшее число проверяемых битов
+def run_monitor(source, monitor: HealthMonitor = None, limit: int = None, report=print) -> HealthMonitor:
+    if monitor is None:
+        monitor = HealthMonitor()
+    for chunk in source:
+        if limit is not None and monitor.samples + len(chunk) > limit:
+            chunk = chunk[:limit - monitor.samples]
+        for alarm in monitor.update(chunk):
+            report(f"ТРЕВОГА [{alarm['test']}] бит {alarm['sample']}: {alarm['description']}")
+        if limit is not None and monitor.samples >= limit:
+            break
+    return monitor
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Непрерывный контроль источника случайных битов')
+    parser.add_argument('source', nargs='?', default='/dev/urandom',
+                        help="файл, устройство или '-' для стандартного ввода (по умолчанию /dev/urandom)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--binary', dest='binary', action='store_true', default=None,
+                      help='двоичные данные: 8 бит в каждом байте')
+    mode.add_argument('--text', dest='binary', action='store_false', help='текст из символов 0 и 1')
+    parser.add_argument('--follow', action='store_true', help='ждать новых данных в конце файла')
+    parser.add_argument('--entropy', type=float, default=1.0, help='заявленная минимальная энтропия на бит')
+    parser.add_argument('--window', type=int, default=ROLLING_WINDOW, help='длина скользящего окна (бит)')
+    parser.add_argument('--limit', type=int, default=None, help='остановиться после указанного числа бит')
+    args = parser.parse_args(argv)
+
+    monitor = HealthMonitor(min_entropy=args.entropy, window=args.window)
+    print(f"Порог теста повторений: {monitor.rct_cutoff}, "
+          f"порог адаптивного теста пропорции: {monitor.apt_cutoff} из {APT_WINDOW}", flush=True)
+    try:
+        run_monitor(iter_source(args.source, args.binary, args.follow), monitor, args.limit,
+                    report=lambda line: print(line, flush=True))
+    except KeyboardInterrupt:
+        pass
+
+    print(f"Проверено бит: {monitor.samples}")
+    for name, count in monitor.alarm_counts.items():
+        print(f"  {name}: тревог {count}")
+    if monitor.filled:
+        for name, result in monitor.rolling_results().items():
+            print(f"  скользящий {name}: P = {result['p_value']:.6f}")
+    return 1 if any(monitor.alarm_counts.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
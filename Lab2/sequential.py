@@ -0,0 +1,277 @@
+# Последовательный (с ранней остановкой) режим частотного теста и теста на
+# одинаковые биты: критерий отношения вероятностей Вальда (SPRT) получает биты
+# порциями и останавливается, как только решение статистически определено
+import copy
+import math
+from bitsequence import BitSequence
+import tests
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy порции обрабатываются побитно
+    np = None
+
+# Вероятность принять гипотезу о случайности для источника с отклонением delta
+DEFAULT_BETA = 0.01
+
+# Отклонение частоты единиц (или смен бита) от 1/2, которое должно обнаруживаться
+DEFAULT_DELTA = 0.01
+
+# Наибольшее число бит; если решение не принято, применяется обычный тест
+DEFAULT_MAX_BITS = 10 ** 8
+
+# Размер первой и наибольшей порции, запрашиваемой у источника (бит)
+_FIRST_CHUNK = 256
+_LARGEST_CHUNK = 1 << 16
+
+
+# Порции битов из генератора (объект с random_bits), готовой последовательности
+# (строка или BitSequence) или итератора порций. Порции растут вдвое, чтобы
+# грубо испорченный источник отбраковывался после нескольких сотен бит
+def _iter_chunks(source):
+    size = _FIRST_CHUNK
+    if hasattr(source, 'random_bits'):
+        while True:
+            yield source.random_bits(size, packed=True)
+            size = min(size * 2, _LARGEST_CHUNK)
+    if isinstance(source, (str, BitSequence)):
+        bits = BitSequence.coerce(source)
+        start = 0
+        while start < len(bits):
+            yield bits[start:start + size]
+            start += size
+            size = min(size * 2, _LARGEST_CHUNK)
+        return
+    for chunk in source:
+        yield BitSequence.coerce(chunk)
+
+
+# Двусторонний SPRT для последовательности независимых индикаторов 0/1:
+# H0: P(1) = 1/2 против H1: P(1) = 1/2 ± delta. Каждая из двух односторонних
+# альтернатив проверяется отдельно; H0 принимается, когда отвергнуты обе
+class SequentialProbabilityRatio:
+    def __init__(self, alpha: float = tests.DEFAULT_ALPHA, beta: float = DEFAULT_BETA,
+                 delta: float = DEFAULT_DELTA):
+        if not 0 < delta < 0.5:
+            raise ValueError("delta должно лежать в интервале (0, 0.5)")
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        # Приращения логарифма отношения правдоподобия за индикатор 1 и за 0
+        self.steps = [(math.log1p(2 * delta), math.log1p(-2 * delta)),
+                      (math.log1p(-2 * delta), math.log1p(2 * delta))]
+        self.n = 0
+        self.ones = 0
+        self.ratios = [0.0, 0.0]
+        self.sides = [None, None]  # None, 'H0' или 'H1' для каждой альтернативы
+        self.decision = None
+
+    # Решение по очередной стороне после n индикаторов, из которых ones единиц
+    def _crossing(self, side: int, n: int, ones: int):
+        up, down = self.steps[side]
+        ratio = ones * up + (n - ones) * down
+        if ratio >= self.upper:
+            return 'H1', ratio
+        if ratio <= self.lower:
+            return 'H0', ratio
+        return None, ratio
+
+    # Запись решения по стороне; True, если принято общее решение
+    def _settle(self, side: int, verdict: str, ratio: float) -> bool:
+        self.sides[side] = verdict
+        self.ratios[side] = ratio
+        if verdict == 'H1' or all(s == 'H0' for s in self.sides):
+            self.decision = verdict
+            return True
+        return False
+
+    # Обработка индикаторов x (массив NumPy или список 0/1); возвращает индекс
+    # в x, на котором принято решение, или None. После решения состояние не меняется
+    def update(self, x):
+        if self.decision is not None or not len(x):
+            return None
+        if np is None:
+            for index, value in enumerate(x):
+                self.n += 1
+                self.ones += value
+                for side in range(2):
+                    if self.sides[side] is None:
+                        verdict, self.ratios[side] = self._crossing(side, self.n, self.ones)
+                        if verdict and self._settle(side, verdict, self.ratios[side]):
+                            return index
+            return None
+
+        ones = np.cumsum(x, dtype=np.int64) + self.ones
+        count = np.arange(self.n + 1, self.n + len(x) + 1, dtype=np.int64)
+        events = []
+        for side, (up, down) in enumerate(self.steps):
+            if self.sides[side] is not None:
+                continue
+            ratio = ones * up + (count - ones) * down
+            crossed = np.flatnonzero((ratio >= self.upper) | (ratio <= self.lower))
+            if len(crossed):
+                index = int(crossed[0])
+                events.append((index, side, 'H1' if ratio[index] >= self.upper else 'H0', float(ratio[index])))
+        for index, side, verdict, ratio in sorted(events):
+            if self._settle(side, verdict, ratio):
+                self.n += index + 1
+                self.ones = int(ones[index])
+                self._refresh()
+                return index
+        self.n += len(x)
+        self.ones = int(ones[-1])
+        self._refresh()
+        return None
+
+    # Пересчёт отношений правдоподобия ещё не решённых сторон
+    def _refresh(self):
+        for side in range(2):
+            if self.sides[side] is None:
+                self.ratios[side] = self._crossing(side, self.n, self.ones)[1]
+
+
+# Последовательная проверка источника выбранными тестами ('frequency', 'runs') на
+# общих битах. Останавливается, когда приняты все решения или хотя бы один тест
+# отверг случайность
+def sequential_battery(source, tests_to_run: list = None, alpha: float = tests.DEFAULT_ALPHA,
+                       beta: float = DEFAULT_BETA, delta: float = DEFAULT_DELTA,
+                       max_bits: int = DEFAULT_MAX_BITS) -> dict:
+    kinds = tests_to_run or ['frequency', 'runs']
+    for kind in kinds:
+        if kind not in ('frequency', 'runs'):
+            raise ValueError(f"последовательный режим не поддерживает тест '{kind}'")
+    sprts = {kind: SequentialProbabilityRatio(alpha, beta, delta) for kind in kinds}
+    decided_at = {}  # номер бита (с единицы), на котором принято решение
+    n = 0
+    ones = 0
+    transitions = 0
+    last = None
+
+    for chunk in _iter_chunks(source):
+        if n + len(chunk) > max_bits:
+            chunk = chunk[:max_bits - n]
+        if not chunk:
+            break
+        x = chunk.unpack() if np is not None else list(chunk)
+
+        # Индикатор смены бита j относится к биту j + 1 порции (или j при переносе)
+        if np is not None:
+            changes = x[1:] != x[:-1]
+            if last is not None:
+                changes = np.concatenate(([x[0] != last], changes))
+            changes = changes.astype(np.uint8)
+        else:
+            changes = [int(a != b) for a, b in zip(x, x[1:])]
+            if last is not None:
+                changes.insert(0, int(x[0] != last))
+        shift = 0 if last is not None else 1
+
+        before = copy.deepcopy(sprts)
+        found = _feed(sprts, x, changes, shift)
+        rejected = [index for kind, index in found.items() if sprts[kind].decision == 'H1']
+        stop = len(x)
+        if rejected:
+            stop = min(rejected) + 1
+        elif all(sprt.decision is not None for sprt in sprts.values()):
+            stop = max(found.values()) + 1
+        if stop < len(x):
+            # Решения после точки остановки не должны учитываться: повтор на усечённой порции
+            sprts = before
+            found = _feed(sprts, x[:stop], changes[:stop - shift], shift)
+        for kind, index in found.items():
+            decided_at[kind] = n + index + 1
+
+        consumed = chunk[:stop]
+        ones += consumed.count(1)
+        transitions += consumed.transitions() + (last is not None and last != consumed[0])
+        last = consumed[-1]
+        n += stop
+        if stop < len(x) or all(sprt.decision is not None for sprt in sprts.values()) or n >= max_bits:
+            break
+
+    stats = {'bits': None, 'n': n, 'ones': ones, 'zeros': n - ones, 'transitions': transitions}
+    results = {kind: _sequential_result(kind, sprt, decided_at.get(kind), stats, alpha)
+               for kind, sprt in sprts.items()}
+    results['bits_used'] = n
+    return results
+
+
+# Подача порции во все ещё не решённые критерии; возвращает номера битов порции,
+# на которых приняты решения
+def _feed(sprts: dict, x, changes, shift: int) -> dict:
+    found = {}
+    for kind, sprt in sprts.items():
+        if sprt.decision is not None:
+            continue
+        if kind == 'frequency':
+            index = sprt.update(x)
+        else:
+            index = sprt.update(changes)
+            index = None if index is None else index + shift
+        if index is not None:
+            found[kind] = index
+    return found
+
+
+# Итог одного теста: решение SPRT, а если его нет - обычный тест по прочитанным битам
+def _sequential_result(kind: str, sprt: SequentialProbabilityRatio, decided_at: int, stats: dict,
+                       alpha: float) -> dict:
+    title = 'Частотный тест' if kind == 'frequency' else 'Тест на последовательность одинаковых бит'
+    if stats['n'] < 2:
+        return tests._error_result("Источник не выдал ни одного бита")
+    fixed = (tests._frequency_from_stats if kind == 'frequency' else tests._runs_from_stats)(stats, alpha)
+    measured = 'единиц' if kind == 'frequency' else 'смен бита'
+    statistic = max(sprt.ratios)
+
+    if sprt.decision is None:
+        passed = fixed['passed']
+        verdict = (f"Решение не принято за {stats['n']} бит, применён обычный тест: "
+                   f"{'ПРОЙДЕН' if passed else 'НЕ ПРОЙДЕН'}")
+    else:
+        passed = sprt.decision == 'H0'
+        verdict = (f"Решение принято после {decided_at} бит: "
+                   f"{'последовательность случайна' if passed else 'последовательность НЕ случайна'}")
+
+    description = (
+        f"{title} (последовательный режим, SPRT)\n"
+        f"Альтернатива: доля {measured} 1/2 ± {math.expm1(sprt.steps[0][0]) / 2:g}\n"
+        f"Границы ln отношения правдоподобия: [{sprt.lower:.4f}, {sprt.upper:.4f}]\n"
+        f"Индикаторов {measured}: {sprt.ones} из {sprt.n}\n"
+        f"ln отношения правдоподобия (доля > 1/2, < 1/2): {sprt.ratios[0]:.4f}, {sprt.ratios[1]:.4f}\n"
+        f"P-значение обычного теста по прочитанным битам: {fixed['p_value']:.6f}\n"
+        f"{verdict}"
+    )
+    return {
+        'passed': passed,
+        'statistic': statistic,
+        'threshold': sprt.upper,
+        'p_value': fixed['p_value'],
+        'alpha': alpha,
+        'description': description,
+        'decision': sprt.decision,
+        'bits_used': decided_at if decided_at is not None else stats['n']
+    }
+
+
+# Последовательный частотный тест
+def sequential_frequency_test(source, alpha: float = tests.DEFAULT_ALPHA, beta: float = DEFAULT_BETA,
+                              delta: float = DEFAULT_DELTA, max_bits: int = DEFAULT_MAX_BITS) -> dict:
+    return sequential_battery(source, ['frequency'], alpha, beta, delta, max_bits)['frequency']
+
+
+# Последовательный тест на одинаковые биты (доля смен бита)
+def sequential_runs_test(source, alpha: float = tests.DEFAULT_ALPHA, beta: float = DEFAULT_BETA,
+                         delta: float = DEFAULT_DELTA, max_bits: int = DEFAULT_MAX_BITS) -> dict:
+    return sequential_battery(source, ['runs'], alpha, beta, delta, max_bits)['runs']
+
+
+if __name__ == "__main__":
+    import generators
+
+    for title, source in [("Парк-Миллер, seed=12345", generators.ParkMillerGenerator(12345)),
+                          ("Смещённая последовательность", '1101' * 10000),
+                          ("Чередование битов", '01' * 10000)]:
+        results = sequential_battery(source)
+        print(f"=== {title}: прочитано {results['bits_used']} бит ===")
+        for kind in ('frequency', 'runs'):
+            print(results[kind]['description'])
+        print()
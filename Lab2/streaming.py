@@ -0,0 +1,242 @@
+# Потоковый подсчёт статистик частотного теста и теста на одинаковые биты
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from bitsequence import BitSequence
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy блуждание считается побитно на чистом Python
+    np = None
+
+# Всё, кроме 0 и 1, в файлах пропускается (как при загрузке в GUI)
+_NOT_BITS = re.compile(rb'[^01]')
+
+# Размер порции чтения файла (байт)
+_READ_SIZE = 8 * 1024 * 1024
+
+# Размер порции, по которой строится блуждание (бит): ограничивает временную память
+_WALK_BITS = 1 << 22
+
+# Состояния блуждания, посещения которых считаются по циклам (-4..4) и всего (-9..9)
+EXCURSION_STATES = 4
+VARIANT_STATES = 9
+
+
+# Накопитель статистики частотного теста: длина и число единиц
+class FrequencyAccumulator:
+    def __init__(self):
+        self.n = 0
+        self.ones = 0
+
+    # Обработка очередной порции последовательности
+    def update(self, chunk):
+        chunk = BitSequence.coerce(chunk)
+        self.n += len(chunk)
+        self.ones += chunk.count(1)
+        return self
+
+    # Объединение с состоянием, посчитанным по следующему участку последовательности
+    def merge(self, other):
+        self.n += other.n
+        self.ones += other.ones
+        return self
+
+    # Статистика в формате tests.collect_statistics
+    def statistics(self):
+        return {
+            'bits': None,
+            'n': self.n,
+            'ones': self.ones,
+            'zeros': self.n - self.ones,
+            'transitions': None
+        }
+
+
+# Накопитель статистики теста на одинаковые биты: дополнительно число смен бита
+# и граничные биты, чтобы учесть смены на стыках порций
+class RunsAccumulator(FrequencyAccumulator):
+    def __init__(self):
+        super().__init__()
+        self.transitions = 0
+        self.first_bit = None
+        self.last_bit = None
+
+    def update(self, chunk):
+        chunk = BitSequence.coerce(chunk)
+        if not chunk:
+            return self
+        if self.last_bit is None:
+            self.first_bit = chunk[0]
+        elif self.last_bit != chunk[0]:
+            self.transitions += 1
+        self.transitions += chunk.transitions()
+        self.last_bit = chunk[-1]
+        return super().update(chunk)
+
+    def merge(self, other):
+        if other.last_bit is None:
+            return self
+        if self.last_bit is None:
+            self.first_bit = other.first_bit
+        elif self.last_bit != other.first_bit:
+            self.transitions += 1
+        self.transitions += other.transitions
+        self.last_bit = other.last_bit
+        return super().merge(other)
+
+    def statistics(self):
+        stats = super().statistics()
+        stats['transitions'] = self.transitions
+        return stats
+
+
+# Накопитель статистики тестов случайных отклонений (NIST SP 800-22, 2.14 и 2.15).
+# Блуждание S_k = Σ(2·b_i - 1) строится порциями (cumsum), нули блуждания делят его
+# на циклы, посещения состояний в каждом цикле считаются одной гистограммой (bincount)
+# по парам (номер цикла, состояние). Незакрытый последний цикл переносится в следующую
+# порцию, поэтому всё блуждание в памяти не хранится
+class ExcursionsAccumulator:
+    def __init__(self):
+        self.n = 0
+        self.position = 0
+        self.cycles = 0
+        # Посещения состояний -4..4 в незакрытом цикле
+        self.open_visits = [0] * (2 * EXCURSION_STATES + 1)
+        # cycle_counts[x + 4][k] - число циклов с k посещениями состояния x (k = 5 - пять и более)
+        self.cycle_counts = [[0] * 6 for _ in range(2 * EXCURSION_STATES + 1)]
+        # Общее число посещений состояний -9..9
+        self.visits = [0] * (2 * VARIANT_STATES + 1)
+
+    # Обработка очередной порции последовательности
+    def update(self, chunk):
+        chunk = BitSequence.coerce(chunk)
+        for start in range(0, len(chunk), _WALK_BITS):
+            if np is None:
+                self._update_bits(chunk[start:start + _WALK_BITS])
+            else:
+                self._update_walk(chunk.unpack(start, min(len(chunk), start + _WALK_BITS)))
+        self.n += len(chunk)
+        return self
+
+    # Обработка порции без NumPy: по одному шагу блуждания
+    def _update_bits(self, bits):
+        for bit in bits:
+            self.position += 2 * bit - 1
+            if abs(self.position) <= VARIANT_STATES:
+                self.visits[self.position + VARIANT_STATES] += 1
+            if self.position == 0:
+                self._close_cycle(self.open_visits)
+                self.open_visits = [0] * (2 * EXCURSION_STATES + 1)
+            elif abs(self.position) <= EXCURSION_STATES:
+                self.open_visits[self.position + EXCURSION_STATES] += 1
+
+    # Обработка порции распакованных битов средствами NumPy. Шаги со значением
+    # блуждания вне -9..9 ни на что не влияют, поэтому номера циклов и гистограммы
+    # считаются только по шагам вблизи нуля (обычно малая доля порции)
+    def _update_walk(self, bits):
+        local = np.cumsum(bits.view(np.int8) * 2 - 1, dtype=np.int32)
+        position = self.position
+        self.position += int(local[-1])
+        if abs(position) > VARIANT_STATES + len(local):
+            return
+        # -9 ≤ position + local ≤ 9 одним сравнением беззнаковых чисел
+        shifted = local + (VARIANT_STATES + position)
+        walk = local[shifted.view(np.uint32) <= 2 * VARIANT_STATES] + position
+        if not len(walk):
+            return
+
+        for state, count in enumerate(np.bincount(walk + VARIANT_STATES, minlength=2 * VARIANT_STATES + 1)):
+            self.visits[state] += int(count)
+
+        # Номер цикла шага - число нулей блуждания до него; ноль завершает свой цикл
+        zeros = walk == 0
+        cycle = np.cumsum(zeros)
+        cycle -= zeros
+        closed = int(cycle[-1]) + int(zeros[-1])
+        width = 2 * EXCURSION_STATES + 1
+        inside = np.abs(walk) <= EXCURSION_STATES
+        visits = np.bincount(cycle[inside] * width + walk[inside] + EXCURSION_STATES,
+                             minlength=(closed + 1) * width).reshape(closed + 1, width)
+        visits[0] += np.array(self.open_visits)
+        # Посещения нуля (столбец 4) попадают в гистограмму, но не используются
+        if closed:
+            classes = np.minimum(visits[:closed], 5) + np.arange(width) * 6
+            counts = np.bincount(classes.ravel(), minlength=width * 6).reshape(width, 6)
+            for state in range(width):
+                for k in range(6):
+                    self.cycle_counts[state][k] += int(counts[state, k])
+            self.cycles += closed
+        self.open_visits = visits[closed].tolist()
+
+    # Учёт завершённого цикла с заданными посещениями состояний
+    def _close_cycle(self, visits):
+        for state, count in enumerate(visits):
+            self.cycle_counts[state][min(count, 5)] += 1
+        self.cycles += 1
+
+    # Итоговая статистика: число циклов J, распределение циклов по числу посещений
+    # и общее число посещений. Если S_n ≠ 0, незакрытый цикл завершается
+    # (к блужданию условно приписан нуль), само состояние накопителя не меняется
+    def statistics(self):
+        cycles = self.cycles
+        cycle_counts = [row[:] for row in self.cycle_counts]
+        if self.position != 0:
+            for state, count in enumerate(self.open_visits):
+                cycle_counts[state][min(count, 5)] += 1
+            cycles += 1
+        return {
+            'n': self.n,
+            'cycles': cycles,
+            'cycle_counts': {state - EXCURSION_STATES: cycle_counts[state]
+                             for state in range(2 * EXCURSION_STATES + 1) if state != EXCURSION_STATES},
+            'visits': {state - VARIANT_STATES: self.visits[state]
+                       for state in range(2 * VARIANT_STATES + 1) if state != VARIANT_STATES}
+        }
+
+
+# Накопление статистики по итерируемому набору порций (строк или BitSequence)
+def accumulate(chunks, accumulator=None):
+    if accumulator is None:
+        accumulator = RunsAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator
+
+
+# Чтение участка [start, stop) текстового файла порциями из 0 и 1
+def iter_file_chunks(path, start=0, stop=None, read_size=_READ_SIZE):
+    with open(path, 'rb') as file:
+        if stop is None:
+            stop = os.fstat(file.fileno()).st_size
+        file.seek(start)
+        position = start
+        while position < stop:
+            data = file.read(min(read_size, stop - position))
+            if not data:
+                break
+            position += len(data)
+            yield _NOT_BITS.sub(b'', data).decode('ascii')
+
+
+# Статистика одного участка файла (выполняется в отдельном процессе)
+def _file_range_statistics(path, start, stop):
+    return accumulate(iter_file_chunks(path, start, stop))
+
+
+# Статистика текстового файла, не загружаемого в память целиком.
+# При workers > 1 файл делится на участки, которые считаются в пуле процессов
+# и объединяются по порядку - результат совпадает с последовательным подсчётом
+def file_statistics(path, workers=None):
+    if not workers or workers == 1:
+        return accumulate(iter_file_chunks(path))
+
+    size = os.path.getsize(path)
+    parts = workers * 4
+    bounds = [size * i // parts for i in range(parts + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(_file_range_statistics, [path] * parts, bounds[:-1], bounds[1:])
+        result = RunsAccumulator()
+        for partial in partials:
+            result.merge(partial)
+    return result
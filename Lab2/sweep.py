@@ -0,0 +1,133 @@
+# Массовая проверка начальных значений (seed) генератора Парка-Миллера:
+# потоки всех seed идут в ногу как один массив состояний, число единиц и смен
+# бита считается сразу для всех строк, по ним - частотный тест и тест на
+# одинаковые биты. Результат - таблица seed, упорядоченная от худших к лучшим
+import re
+from generators import ParkMillerGenerator
+import tests
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy каждый seed генерируется отдельно
+    np = None
+
+# Наибольшее число состояний в порции (шаги x seed): ограничивает временную память
+_SWEEP_CELLS = 1 << 21
+
+# Наибольшее число seed в одной проверке
+MAX_SEEDS = 1 << 20
+
+
+# Разбор списка seed: числа и диапазоны через запятую, например "12345" или "1-5000, 77"
+def parse_seeds(text: str) -> list:
+    seeds = []
+    for part in text.replace(';', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d+)\s*(?:-|\.\.)\s*(\d+)', part)
+        if match:
+            first, last = int(match.group(1)), int(match.group(2))
+            if last < first:
+                raise ValueError(f'пустой диапазон seed "{part}"')
+            if len(seeds) + last - first + 1 > MAX_SEEDS:
+                raise ValueError(f'слишком много seed (больше {MAX_SEEDS})')
+            seeds.extend(range(first, last + 1))
+        elif part.isdigit():
+            seeds.append(int(part))
+        else:
+            raise ValueError(f'некорректный seed "{part}"')
+    if not seeds:
+        raise ValueError('не задано ни одного seed')
+    return seeds
+
+
+# Число единиц и смен бита в первых n битах потока каждого seed.
+# Вектор состояний всех seed за шаг умножается на a по модулю m; шаги
+# собираются в порции (шаги x seed), которые обрабатываются целиком
+def seed_statistics(seeds: list, n: int) -> tuple:
+    if np is None:
+        ones = []
+        transitions = []
+        for seed in seeds:
+            bits = ParkMillerGenerator(seed).random_bits(n, packed=True)
+            ones.append(bits.count(1))
+            transitions.append(bits.transitions())
+        return ones, transitions
+
+    generator = ParkMillerGenerator(1)
+    a = np.uint64(generator.a)
+    m = np.uint64(generator.m)
+    # Начальные состояния - как в ParkMillerGenerator(seed): seed mod m, 0 заменяется на 1
+    states = np.array([ParkMillerGenerator(seed).state for seed in seeds], dtype=np.uint64)
+    ones = np.zeros(len(seeds), dtype=np.int64)
+    transitions = np.zeros(len(seeds), dtype=np.int64)
+    last = None
+    steps = max(1, _SWEEP_CELLS // len(seeds))
+    block = np.empty((min(steps, n), len(seeds)), dtype=np.uint64)
+    for first in range(0, n, steps):
+        rows = min(steps, n - first)
+        for row in range(rows):
+            np.multiply(states, a, out=states)
+            np.remainder(states, m, out=states)
+            block[row] = states
+        bits = (block[:rows] & np.uint64(1)).astype(np.uint8)
+        ones += bits.sum(axis=0, dtype=np.int64)
+        transitions += np.count_nonzero(bits[1:] != bits[:-1], axis=0)
+        if last is not None:
+            transitions += bits[0] != last
+        last = bits[rows - 1].copy()
+    return ones.tolist(), transitions.tolist()
+
+
+# Проверка набора seed по первым n битам каждого потока. Строки упорядочены по
+# меньшему из двух P-значений: вверху самые подозрительные начальные значения
+def sweep_seeds(seeds: list, n: int = 10000, alpha: float = None, top: int = 20) -> dict:
+    if n < 2:
+        return tests._error_result('для проверки нужно не менее 2 бит на seed')
+    if not seeds:
+        return tests._error_result('не задано ни одного seed')
+    ones, transitions = seed_statistics(seeds, n)
+
+    rows = []
+    for seed, seed_ones, seed_transitions in zip(seeds, ones, transitions):
+        stats = {'bits': None, 'n': n, 'ones': seed_ones, 'zeros': n - seed_ones,
+                 'transitions': seed_transitions}
+        frequency = tests._frequency_from_stats(stats, alpha)
+        runs = tests._runs_from_stats(stats, alpha)
+        rows.append({
+            'seed': seed,
+            'ones': seed_ones,
+            'transitions': seed_transitions,
+            'frequency_statistic': frequency['statistic'],
+            'frequency_p_value': frequency['p_value'],
+            'runs_statistic': runs['statistic'],
+            'runs_p_value': runs['p_value'],
+            'passed': frequency['passed'] and runs['passed']
+        })
+    rows.sort(key=lambda row: (min(row['frequency_p_value'], row['runs_p_value']), row['seed']))
+
+    failed = sum(not row['passed'] for row in rows)
+    lines = [
+        f"Проверка seed генератора Парка-Миллера: {len(rows)} seed по {n} бит",
+        f"Не прошли хотя бы один тест: {failed} ({failed / len(rows):.2%})",
+        "Худшие seed (по меньшему P-значению):",
+        f"{'seed':>12} {'единиц':>10} {'смен':>10} {'P частотный':>12} {'P серий':>12}  итог"
+    ]
+    for row in rows[:top]:
+        lines.append(f"{row['seed']:>12} {row['ones']:>10} {row['transitions']:>10} "
+                     f"{row['frequency_p_value']:>12.6f} {row['runs_p_value']:>12.6f}  "
+                     f"{'пройден' if row['passed'] else 'НЕ ПРОЙДЕН'}")
+    return {
+        'passed': failed == 0,
+        'statistic': failed,
+        'threshold': 0,
+        'p_value': min(min(row['frequency_p_value'], row['runs_p_value']) for row in rows),
+        'alpha': alpha,
+        'description': '\n'.join(lines),
+        'rows': rows
+    }
+
+
+if __name__ == "__main__":
+    print(sweep_seeds(parse_seeds('1-2000'), 10000)['description'])
@@ -1,32 +1,125 @@
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from bitsequence import BitSequence, row_statistics, block_ones, _np_row_popcount
+from streaming import FrequencyAccumulator, ExcursionsAccumulator
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy тесты выполняются на чистом Python, но медленнее
+    np = None
+
+# Порог методички для статистики S (используется, если alpha не задан)
+THRESHOLD = 1.82138636
+
+# Уровень значимости по умолчанию для тестов NIST и пакетного режима
+DEFAULT_ALPHA = 0.01
+
+
+# Регуляризованная верхняя неполная гамма-функция Q(a, x) (igamc в NIST STS)
+def igamc(a: float, x: float) -> float:
+    if x <= 0:
+        return 1.0
+    if x < a + 1:
+        # Ряд для нижней функции P(a, x)
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(-x + a * math.log(x) - math.lgamma(a)))
+    # Цепная дробь для Q(a, x) (метод Лентца)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        if abs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(-x + a * math.log(x) - math.lgamma(a)) * h
+
+
+# Результат с ошибкой входных данных
+def _error_result(message: str) -> dict:
+    return {
+        'passed': False,
+        'statistic': 0.0,
+        'threshold': THRESHOLD,
+        'p_value': 0.0,
+        'description': f'Ошибка: {message}'
+    }
+
+
+# Результат теста, неприменимого к последовательности (например, слишком короткой).
+# Это не отказ: run_batch не учитывает такие результаты в доле и гистограмме
+def _not_applicable_result(message: str) -> dict:
+    return {
+        'passed': None,
+        'not_applicable': True,
+        'statistic': 0.0,
+        'threshold': THRESHOLD,
+        'p_value': None,
+        'description': f'Тест неприменим: {message}'
+    }
+
+
+# Проверка последовательности и сбор общей статистики за один проход
+# Вместо последовательности можно передать накопитель из streaming
+# Возвращает (статистика, None) или (None, результат с ошибкой)
+def collect_statistics(bit_sequence: str | BitSequence | FrequencyAccumulator) -> tuple:
+    # Статистика, уже накопленная по порциям
+    if isinstance(bit_sequence, FrequencyAccumulator):
+        if not bit_sequence.n:
+            return None, _error_result('пустая последовательность')
+        return bit_sequence.statistics(), None
 
-# Частотный тест
-def frequency_test(bit_sequence: str) -> dict:
     # Проверка входных данных
     if not bit_sequence:
-        return {
-            'passed': False,
-            'statistic': 0.0,
-            'threshold': 1.82138636,
-            'description': 'Ошибка: пустая последовательность'
-        }
+        return None, _error_result('пустая последовательность')
+
+    # Проверка корректности символов и упаковка в BitSequence
+    try:
+        bits = BitSequence.coerce(bit_sequence)
+    except ValueError as e:
+        return None, _error_result(str(e))
+
+    n = len(bits)
+    ones = bits.count(1)
+    stats = {
+        'bits': bits,
+        'n': n,
+        'ones': ones,
+        'zeros': n - ones,
+        'transitions': bits.transitions()
+    }
+    return stats, None
 
-    # Проверка корректности символов
-    for bit in bit_sequence:
-        if bit not in '01':
-            return {
-                'passed': False,
-                'statistic': 0.0,
-                'threshold': 1.82138636,
-                'description': f'Ошибка: некорректный символ "{bit}"'
-            }
-    n = len(bit_sequence)
 
-    # 1. Преобразование 0/1 в -1/1
-    X = [2 * int(bit) - 1 for bit in bit_sequence]
+# Частотный тест по собранной статистике
+# alpha=None - критерий методички (S ≤ 1.82138636), иначе P-значение ≥ alpha
+def _frequency_from_stats(stats: dict, alpha: float = None) -> dict:
+    n = stats['n']
+    zeros = stats['zeros']
+    ones = stats['ones']
 
-    # 2. Вычисление суммы Sn
-    Sn = sum(X)
+    # 1-2. Сумма Sn последовательности из -1/1 равна (единицы - нули)
+    Sn = ones - zeros
 
     # 3. Вычисление статистики S
     try:
@@ -34,13 +127,17 @@ def frequency_test(bit_sequence: str) -> dict:
     except ZeroDivisionError:
         S = float('inf')
 
+    # P-значение: erfc(|Sn| / sqrt(2n))
+    p_value = math.erfc(S / math.sqrt(2))
+
     # 4. Сравнение с порогом
-    threshold = 1.82138636
+    if alpha is None:
+        threshold = THRESHOLD
+    else:
+        threshold = NormalDist().inv_cdf(1 - alpha / 2)
     passed = S <= threshold
 
     # Формирование описания
-    zeros = bit_sequence.count('0')
-    ones = bit_sequence.count('1')
     proportion = zeros / n if n > 0 else 0
 
     description = (
@@ -50,6 +147,7 @@ def frequency_test(bit_sequence: str) -> dict:
         f"Пропорция нулей: {proportion:.6f}\n"
         f"Статистика S = {S:.6f}\n"
         f"Пороговое значение: {threshold}\n"
+        f"P-значение: {p_value:.6f}\n"
         f"Условие: S ≤ {threshold} -> {S:.6f} ≤ {threshold} = {passed}"
     )
 
@@ -57,37 +155,26 @@ def frequency_test(bit_sequence: str) -> dict:
         'passed': passed,
         'statistic': S,
         'threshold': threshold,
+        'p_value': p_value,
+        'alpha': alpha,
         'description': description
     }
 
-# Тест на последовательность одинаковых бит
-def runs_test(bit_sequence: str) -> dict:
-    # Проверка входных данных
-    if not bit_sequence:
-        return {
-            'passed': False,
-            'statistic': 0.0,
-            'threshold': 1.82138636,
-            'description': 'Ошибка: пустая последовательность'
-        }
 
-    # Проверка корректности символов
-    for bit in bit_sequence:
-        if bit not in '01':
-            return {
-                'passed': False,
-                'statistic': 0.0,
-                'threshold': 1.82138636,
-                'description': f'Ошибка: некорректный символ "{bit}"'
-            }
-    n = len(bit_sequence)
+# Тест на последовательность одинаковых бит по собранной статистике
+# alpha=None - критерий методички (S ≤ 1.82138636), иначе P-значение ≥ alpha
+def _runs_from_stats(stats: dict, alpha: float = None) -> dict:
+    n = stats['n']
+    if stats['transitions'] is None:
+        return _error_result('не подсчитано число смен бита (нужен RunsAccumulator)')
 
     # 1. Вычисляем частоту единиц
-    ones_count = bit_sequence.count('1')
+    ones_count = stats['ones']
     pi = ones_count / n
 
-    # 2. Проверяем условие |pi - 0.5| < 2 / sqrt(n)
-    if abs(pi - 0.5) >= 2 / math.sqrt(n):
+    # 2. Проверяем условие |pi - 0.5| < 2 / sqrt(n); при n ≤ 15 оно выполняется и для
+    # последовательности из одних нулей или единиц, у которой знаменатель S равен 0
+    if pi in (0, 1) or abs(pi - 0.5) >= 2 / math.sqrt(n):
         # Тест не пройден, возвращаем результат с passed=False
         statistic = abs(pi - 0.5) * math.sqrt(n) / 2
         description = (
@@ -100,29 +187,31 @@ def runs_test(bit_sequence: str) -> dict:
             'passed': False,
             'statistic': statistic,
             'threshold': 2 / math.sqrt(n),
+            'p_value': 0.0,
+            'alpha': alpha,
             'description': description
         }
 
-    # 3. Вычисляем Vn (число блоков)
-    # Инициализируем счетчик блоков
-    blocks = 1  # Первый блок начинается с первого бита
-    for i in range(1, n):
-        if bit_sequence[i] != bit_sequence[i - 1]:
-            blocks += 1
-
-    Vn = blocks
+    # 3. Вычисляем Vn (число блоков): первый блок плюс каждая смена бита
+    Vn = stats['transitions'] + 1
 
     # 4. Вычисляем статистику S
     numerator = abs(Vn - 2 * n * pi * (1 - pi))
     denominator = 2 * math.sqrt(2 * n) * pi * (1 - pi)
     S = numerator / denominator
 
+    # P-значение: erfc(S)
+    p_value = math.erfc(S)
+
     # 5. Сравниваем с порогом
-    threshold = 1.82138636
+    if alpha is None:
+        threshold = THRESHOLD
+    else:
+        threshold = NormalDist().inv_cdf(1 - alpha / 2) / math.sqrt(2)
     passed = S <= threshold
 
     # Формируем описание
-    zeros_count = bit_sequence.count('0')
+    zeros_count = stats['zeros']
     description = (
         f"Длина последовательности: {n} бит\n"
         f"Количество нулей: {zeros_count}\n"
@@ -131,6 +220,7 @@ def runs_test(bit_sequence: str) -> dict:
         f"Количество блоков (Vn): {Vn}\n"
         f"Статистика S = {S:.6f}\n"
         f"Пороговое значение: {threshold}\n"
+        f"P-значение: {p_value:.6f}\n"
         f"Условие: S ≤ {threshold} -> {S:.6f} ≤ {threshold} = {passed}"
     )
 
@@ -138,6 +228,1738 @@ def runs_test(bit_sequence: str) -> dict:
         'passed': passed,
         'statistic': S,
         'threshold': threshold,
+        'p_value': p_value,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Частотный тест
+def frequency_test(bit_sequence: str | BitSequence | FrequencyAccumulator, alpha: float = None) -> dict:
+    stats, error = collect_statistics(bit_sequence)
+    if error:
+        return error
+    return _frequency_from_stats(stats, alpha)
+
+
+# Тест на последовательность одинаковых бит
+def runs_test(bit_sequence: str | BitSequence | FrequencyAccumulator, alpha: float = None) -> dict:
+    stats, error = collect_statistics(bit_sequence)
+    if error:
+        return error
+    return _runs_from_stats(stats, alpha)
+
+
+# Проверка и упаковка последовательности для тестов NIST
+# Возвращает (BitSequence, None) или (None, результат с ошибкой)
+def _prepare_bits(bit_sequence: str | BitSequence) -> tuple:
+    if not bit_sequence:
+        return None, _error_result('пустая последовательность')
+    try:
+        return BitSequence.coerce(bit_sequence), None
+    except ValueError as e:
+        return None, _error_result(str(e))
+
+
+# Тест частот в блоках (NIST SP 800-22, 2.2): доля единиц в каждом M-битном блоке
+def block_frequency_test(bit_sequence: str | BitSequence, block_size: int = 128, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    if block_size < 1:
+        return _error_result('размер блока M должен быть положительным')
+    n = len(bits)
+    blocks = n // block_size
+    if blocks == 0:
+        return _not_applicable_result(f'последовательность короче блока ({block_size} бит)')
+
+    # 1. Число единиц во всех блоках за один векторизованный проход
+    ones = block_ones(bits, block_size)
+
+    # 2. Доли единиц и статистика хи-квадрат = 4M·Σ(pi_i - 1/2)²
+    # Блок с наибольшим отклонением от 1/2 показывает, где сосредоточено смещение
+    if isinstance(ones, list):
+        proportions = [count / block_size for count in ones]
+        deviations = [(pi - 0.5) ** 2 for pi in proportions]
+        total = sum(deviations)
+        worst = max(range(blocks), key=deviations.__getitem__)
+    else:
+        proportions = ones / block_size
+        deviations = (proportions - 0.5) ** 2
+        total = float(deviations.sum())
+        worst = int(deviations.argmax())
+    chi_square = 4 * block_size * total
+
+    # 3. P-значение
+    p_value = igamc(blocks / 2, chi_square / 2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Размер блока M: {block_size} бит, число блоков N: {blocks}\n"
+        f"Наибольшее отклонение: блок {worst} (биты {worst * block_size}-{(worst + 1) * block_size - 1}), "
+        f"доля единиц {float(proportions[worst]):.6f}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'proportions': proportions,
+        'description': description
+    }
+
+
+# Длины серий единиц в байте (старший бит первый): в начале, в конце и наибольшая
+def _byte_run_tables() -> tuple:
+    lead, trail, longest = [], [], []
+    for byte in range(256):
+        bits = format(byte, '08b')
+        lead.append(len(bits) - len(bits.lstrip('1')))
+        trail.append(len(bits) - len(bits.rstrip('1')))
+        longest.append(max(len(run) for run in bits.split('0')))
+    return lead, trail, longest
+
+
+_RUN_LEAD, _RUN_TRAIL, _RUN_LONGEST = _byte_run_tables()
+
+# Наборы параметров теста самой длинной серии единиц (NIST SP 800-22, 2.4):
+# размер блока M -> (минимальная длина n, нижний класс длины серии, вероятности классов)
+LONGEST_RUN_PARAMETERS = {
+    8: (128, 1, [0.2148, 0.3672, 0.2305, 0.1875]),
+    128: (6272, 4, [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124]),
+    10000: (750000, 10, [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727]),
+}
+
+
+# Самая длинная серия единиц в каждом M-битном блоке (M кратно 8).
+# Серии склеиваются на стыках байтов по таблицам, отдельные биты не перебираются.
+# С NumPy возвращает массив, без него - список
+def _longest_runs(bits, block_size: int, blocks: int):
+    row_bytes = block_size // 8
+    data = bits.to_bytes()
+    if np is None:
+        result = []
+        for block in range(blocks):
+            best = current = 0
+            for byte in data[block * row_bytes:(block + 1) * row_bytes]:
+                if byte == 0xFF:
+                    current += 8
+                else:
+                    best = max(best, current + _RUN_LEAD[byte], _RUN_LONGEST[byte])
+                    current = _RUN_TRAIL[byte]
+            result.append(max(best, current))
+        return result
+
+    lead = np.array(_RUN_LEAD, dtype=np.int32)
+    trail = np.array(_RUN_TRAIL, dtype=np.int32)
+    longest = np.array(_RUN_LONGEST, dtype=np.int32)
+    result = np.empty(blocks, dtype=np.int32)
+    # Все блоки порции обрабатываются одновременно, по одному столбцу байтов за шаг
+    step = max(1, (1 << 20) // row_bytes)
+    for first in range(0, blocks, step):
+        last = min(blocks, first + step)
+        x = np.frombuffer(data[first * row_bytes:last * row_bytes], dtype=np.uint8).reshape(-1, row_bytes)
+        best = np.zeros(last - first, dtype=np.int32)
+        current = np.zeros(last - first, dtype=np.int32)
+        for column in range(row_bytes):
+            byte = x[:, column]
+            np.maximum(best, np.maximum(current + lead[byte], longest[byte]), out=best)
+            current = np.where(byte == 0xFF, current + 8, trail[byte])
+        result[first:last] = np.maximum(best, current)
+    return result
+
+
+# Тест на самую длинную серию единиц в блоке (NIST SP 800-22, 2.4)
+# block_size=None выбирает стандартный набор параметров по длине последовательности
+def longest_run_test(bit_sequence: str | BitSequence, block_size: int = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+
+    if block_size is None:
+        suitable = [m for m, (min_n, _, _) in LONGEST_RUN_PARAMETERS.items() if n >= min_n]
+        if not suitable:
+            return _not_applicable_result('для теста нужно не менее 128 бит')
+        block_size = max(suitable)
+    if block_size not in LONGEST_RUN_PARAMETERS:
+        return _error_result(f'размер блока должен быть одним из {list(LONGEST_RUN_PARAMETERS)}')
+    min_n, v_min, pi = LONGEST_RUN_PARAMETERS[block_size]
+    if n < min_n:
+        return _not_applicable_result(f'для M = {block_size} нужно не менее {min_n} бит')
+    K = len(pi) - 1
+    blocks = n // block_size
+
+    # 1. Самая длинная серия в каждом блоке
+    runs = _longest_runs(bits, block_size, blocks)
+
+    # 2. Распределение длин по классам v_0..v_K
+    if isinstance(runs, list):
+        counts = [0] * (K + 1)
+        for run in runs:
+            counts[min(max(run - v_min, 0), K)] += 1
+        longest = max(runs)
+    else:
+        counts = np.bincount(np.clip(runs - v_min, 0, K), minlength=K + 1).tolist()
+        longest = int(runs.max())
+
+    # 3. Статистика хи-квадрат и P-значение
+    chi_square = sum((counts[i] - blocks * pi[i]) ** 2 / (blocks * pi[i]) for i in range(K + 1))
+    p_value = igamc(K / 2, chi_square / 2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Размер блока M: {block_size} бит, число блоков N: {blocks}\n"
+        f"Самая длинная серия единиц: {longest}\n"
+        f"Частоты классов (≤{v_min} ... ≥{v_min + K}): {counts}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'class_counts': counts,
+        'description': description
+    }
+
+
+# Приращение, максимум и минимум частичных сумм ±1 внутри байта (старший бит первый)
+def _byte_walk_tables() -> tuple:
+    delta, high, low = [], [], []
+    for byte in range(256):
+        s = top = bottom = 0
+        for shift in range(7, -1, -1):
+            s += 1 if (byte >> shift) & 1 else -1
+            top = max(top, s)
+            bottom = min(bottom, s)
+        delta.append(s)
+        high.append(top)
+        low.append(bottom)
+    return delta, high, low
+
+
+_WALK_DELTA, _WALK_HIGH, _WALK_LOW = _byte_walk_tables()
+
+
+# Те же таблицы для 16-битных слов (строятся при первом использовании NumPy)
+_walk_word_tables = None
+
+
+def _get_walk_word_tables() -> tuple:
+    global _walk_word_tables
+    if _walk_word_tables is None:
+        words = np.arange(65536, dtype='>u2').view(np.uint8)
+        steps = np.unpackbits(words).reshape(-1, 16).astype(np.int32) * 2 - 1
+        sums = np.cumsum(steps, axis=1)
+        _walk_word_tables = (sums[:, -1].copy(), np.maximum(sums.max(axis=1), 0), np.minimum(sums.min(axis=1), 0))
+    return _walk_word_tables
+
+
+# Случайное блуждание S_k = Σ(2·b_i - 1): итоговое значение, максимум и минимум S_0..S_n.
+# Частичные суммы считаются по 16-битным словам (таблицы + cumsum порциями),
+# поэтому память ограничена размером порции
+def _walk_extremes(bits) -> tuple:
+    n = len(bits)
+    data = bits.to_bytes()
+    position = top = bottom = 0
+    done = 0
+    if np is None:
+        done = n // 8
+        for byte in data[:done]:
+            top = max(top, position + _WALK_HIGH[byte])
+            bottom = min(bottom, position + _WALK_LOW[byte])
+            position += _WALK_DELTA[byte]
+        done *= 8
+    else:
+        delta, high, low = _get_walk_word_tables()
+        dtype = np.int32 if n < 2 ** 31 else np.int64
+        words = np.frombuffer(data[:n // 16 * 2], dtype='>u2')
+        step = 1 << 16
+        for first in range(0, len(words), step):
+            # Индексы в родном порядке байтов заметно ускоряют выборку из таблиц
+            x = words[first:first + step].astype(np.intp)
+            d = delta[x]
+            starts = np.cumsum(d, dtype=dtype)
+            starts -= d
+            starts += position
+            top = max(top, int((starts + high[x]).max()))
+            bottom = min(bottom, int((starts + low[x]).min()))
+            position += int(d.sum())
+        done = len(words) * 16
+    # Оставшиеся биты неполного слова
+    for bit in bits[done:]:
+        position += 2 * bit - 1
+        top = max(top, position)
+        bottom = min(bottom, position)
+    return position, top, bottom
+
+
+# P-значение теста кумулятивных сумм (NIST SP 800-22, 2.13) по максимальному отклонению z.
+# Слагаемые, у которых аргумент Φ больше 8.5 по модулю, дают вклад меньше 1e-17,
+# поэтому суммируется O(√n / z) членов вокруг нуля вместо O(n / z)
+def _cusum_p_value(n: int, z: int) -> float:
+    sqrt_n = math.sqrt(n)
+
+    def phi(x):
+        return 0.5 * math.erfc(-x / math.sqrt(2))
+
+    limit = int((8.5 * sqrt_n / z + 3) / 4) + 1
+    first_sum = 0.0
+    for k in range(max(int((-n / z + 1) / 4), -limit), min(int((n / z - 1) / 4), limit) + 1):
+        first_sum += phi((4 * k + 1) * z / sqrt_n) - phi((4 * k - 1) * z / sqrt_n)
+    second_sum = 0.0
+    for k in range(max(int((-n / z - 3) / 4), -limit), min(int((n / z - 1) / 4), limit) + 1):
+        second_sum += phi((4 * k + 3) * z / sqrt_n) - phi((4 * k + 1) * z / sqrt_n)
+    return min(1.0, max(0.0, 1 - first_sum + second_sum))
+
+
+# Тест кумулятивных сумм (NIST SP 800-22, 2.13) в прямом и обратном направлении.
+# Оба направления считаются по одному проходу: обратное блуждание - это S_n - S_k
+def cumulative_sums_test(bit_sequence: str | BitSequence, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+
+    # 1. Итоговая сумма и экстремумы частичных сумм
+    total, top, bottom = _walk_extremes(bits)
+
+    # 2. Максимальные отклонения прямого и обратного блуждания
+    z_forward = max(top, -bottom)
+    z_backward = max(top - total, total - bottom)
+
+    # 3. P-значения
+    p_forward = _cusum_p_value(n, z_forward)
+    p_backward = _cusum_p_value(n, z_backward)
+    p_value = min(p_forward, p_backward)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Итоговая сумма Sn: {total}\n"
+        f"Максимальное отклонение z (прямое): {z_forward}\n"
+        f"Максимальное отклонение z (обратное): {z_backward}\n"
+        f"P-значение (прямое): {p_forward:.6f}\n"
+        f"P-значение (обратное): {p_backward:.6f}\n"
+        f"Условие: оба P ≥ {alpha} -> {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': max(z_forward, z_backward),
+        'threshold': alpha,
+        'p_value': p_value,
+        'p_values': {'forward': p_forward, 'backward': p_backward},
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Максимальная длина одного преобразования Фурье в спектральном тесте (бит)
+DFT_MAX_SEGMENT = 1 << 24
+
+
+# Число пиков спектра ниже порога T для одного участка последовательности.
+# Используется вещественное БПФ (rfft) над ±1 в float32, без лишних комплексных копий
+def _dft_peaks_below(bits, start: int, stop: int, threshold: float) -> int:
+    x = bits.unpack(start, stop).astype(np.float32)
+    x *= 2
+    x -= 1
+    spectrum = np.fft.rfft(x)
+    del x
+    half = (stop - start) // 2
+    # Сравниваются квадраты модулей - без извлечения корня и без копии |S|
+    power = spectrum.real[:half] ** 2
+    power += spectrum.imag[:half] ** 2
+    return int(np.count_nonzero(power < threshold * threshold))
+
+
+# Спектральный тест (дискретное преобразование Фурье, NIST SP 800-22, 2.6).
+# Последовательности длиннее segment_size делятся на непересекающиеся участки,
+# для каждого считается своё преобразование, а числа пиков N0 и N1 и дисперсии
+# суммируются (участки независимы, поэтому статистика d остаётся нормальной)
+def spectral_test(bit_sequence: str | BitSequence, alpha: float = None,
+                  segment_size: int = DFT_MAX_SEGMENT) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if np is None:
+        return _error_result('для спектрального теста нужен NumPy')
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+    if n < 2:
+        return _error_result('для теста нужно не менее 2 бит')
+
+    # 1. Участки ровно по segment_size бит (длина-степень двойки - быстрое БПФ)
+    # и остаток; остаток короче 2 бит отбрасывается
+    bounds = list(range(0, n, segment_size)) + [n]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < 2:
+        bounds.pop()
+    segments = len(bounds) - 1
+
+    # 2. Число пиков ниже 95%-го порога T = sqrt(ln(1/0.05)·L) на каждом участке
+    observed = 0
+    expected = 0.0
+    variance = 0.0
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        length = stop - start
+        threshold = math.sqrt(math.log(1 / 0.05) * length)
+        observed += _dft_peaks_below(bits, start, stop, threshold)
+        expected += 0.95 * length / 2
+        variance += length * 0.95 * 0.05 / 4
+
+    # 3. Нормированная разность d и P-значение
+    d = (observed - expected) / math.sqrt(variance)
+    p_value = math.erfc(abs(d) / math.sqrt(2))
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Число участков преобразования: {segments}\n"
+        f"Пиков ниже порога N1: {observed}, ожидалось N0: {expected:.1f}\n"
+        f"Статистика d = {d:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': d,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Наибольшая длина шаблона для подсчёта по упакованным байтам (окно + сдвиг ≤ 32 бит)
+MAX_PATTERN_BITS = 24
+
+
+# Значения m-битных окон (m ≤ 24), начинающихся в позициях first..last включительно.
+# Окно в позиции 8k + r берётся из 32-битного слова, начинающегося с байта k,
+# поэтому биты не распаковываются. Выдаёт тройки (r, k0, values):
+# values[j] - окно в позиции 8·(k0 + j) + r
+def _iter_windows(data: bytes, first: int, last: int, m: int):
+    mask = (1 << m) - 1
+    step = 1 << 20
+    for k_start in range(first // 8, last // 8 + 1, step):
+        k_stop = min(last // 8 + 1, k_start + step)
+        chunk = np.frombuffer(data[k_start:k_stop + 3] + bytes(3), dtype=np.uint8).astype(np.uint32)
+        words = chunk[:-3] << 24 | chunk[1:-2] << 16 | chunk[2:-1] << 8 | chunk[3:]
+        for r in range(8):
+            lo = max(k_start, -((r - first) // 8))
+            hi = min(k_stop, (last - r) // 8 + 1) if last >= r else lo
+            if hi > lo:
+                yield r, lo, (words[lo - k_start:hi - k_start] >> (32 - r - m)) & mask
+
+
+# Частоты всех перекрывающихся m-битных шаблонов с переходом через конец
+# последовательности (к ней условно приписаны её первые m - 1 бит); счётчики - bincount
+def pattern_counts(bits, m: int):
+    n = len(bits)
+    mask = (1 << m) - 1
+    # Окна, пересекающие конец последовательности (их m - 1)
+    wrap = bits[max(0, n - m + 1):].to_int() << (m - 1) | bits[:m - 1].to_int()
+    wrap_length = min(n, m - 1) + m - 1
+    tail = [(wrap >> (wrap_length - m - j)) & mask for j in range(min(n, m - 1))]
+
+    if np is None:
+        counts = [0] * (1 << m)
+        value = 0
+        for i, bit in enumerate(bits):
+            value = ((value << 1) | bit) & mask
+            if i >= m - 1:
+                counts[value] += 1
+        for value in tail:
+            counts[value] += 1
+        return counts
+
+    counts = np.zeros(1 << m, dtype=np.int64)
+    # Окна целиком внутри последовательности: позиции 0..n - m
+    for _, _, values in _iter_windows(bits.to_bytes(), 0, n - m, m):
+        counts += np.bincount(values, minlength=1 << m)
+    for value in tail:
+        counts[value] += 1
+    return counts
+
+
+# Свёртка частот m-битных шаблонов в частоты (m - 1)-битных (сумма по последнему биту)
+def _marginal_counts(counts):
+    if isinstance(counts, list):
+        return [counts[2 * i] + counts[2 * i + 1] for i in range(len(counts) // 2)]
+    return counts.reshape(-1, 2).sum(axis=1)
+
+
+# Статистика ψ²_m = 2^m/n · Σν² - n (NIST SP 800-22, 2.11)
+def _psi_square(counts, n: int) -> float:
+    if isinstance(counts, list):
+        total = sum(c * c for c in counts)
+    else:
+        total = int((counts * counts).sum())
+    return len(counts) * total / n - n
+
+
+# Последовательный тест (serial test, NIST SP 800-22, 2.11).
+# Частоты для m - 1 и m - 2 получаются свёрткой частот для m, без повторного прохода
+def serial_test(bit_sequence: str | BitSequence, m: int = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+    if m is None:
+        m = max(2, min(16, int(math.log2(n)) - 3))
+    if not 2 <= m <= MAX_PATTERN_BITS:
+        return _error_result(f'длина шаблона m должна быть от 2 до {MAX_PATTERN_BITS}')
+    if n < m:
+        return _error_result(f'последовательность короче шаблона ({m} бит)')
+
+    # 1. Частоты шаблонов длины m, m - 1, m - 2
+    counts_m = pattern_counts(bits, m)
+    counts_m1 = _marginal_counts(counts_m)
+    psi_m = _psi_square(counts_m, n)
+    psi_m1 = _psi_square(counts_m1, n)
+    psi_m2 = _psi_square(_marginal_counts(counts_m1), n) if m > 2 else 0.0
+
+    # 2. Разности ∇ψ² и ∇²ψ²
+    delta1 = psi_m - psi_m1
+    delta2 = psi_m - 2 * psi_m1 + psi_m2
+
+    # 3. P-значения
+    p_value1 = igamc(2 ** (m - 2), delta1 / 2)
+    p_value2 = igamc(2 ** (m - 3), delta2 / 2)
+    p_value = min(p_value1, p_value2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Длина шаблона m: {m}\n"
+        f"ψ²_m = {psi_m:.6f}, ψ²_m-1 = {psi_m1:.6f}, ψ²_m-2 = {psi_m2:.6f}\n"
+        f"∇ψ² = {delta1:.6f}, ∇²ψ² = {delta2:.6f}\n"
+        f"P-значения: {p_value1:.6f}, {p_value2:.6f}\n"
+        f"Условие: оба P ≥ {alpha} -> {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': delta1,
+        'threshold': alpha,
+        'p_value': p_value,
+        'p_values': {'∇ψ²': p_value1, '∇²ψ²': p_value2},
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Φ_m = Σ π_i·ln π_i по частотам шаблонов
+def _phi(counts, n: int) -> float:
+    if isinstance(counts, list):
+        return sum(c / n * math.log(c / n) for c in counts if c)
+    pi = counts[counts > 0] / n
+    return float((pi * np.log(pi)).sum())
+
+
+# Тест приближённой энтропии (NIST SP 800-22, 2.12).
+# Частоты для m получаются свёрткой частот для m + 1
+def approximate_entropy_test(bit_sequence: str | BitSequence, m: int = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+    if m is None:
+        m = max(1, min(10, int(math.log2(n)) - 6))
+    if not 1 <= m < MAX_PATTERN_BITS:
+        return _error_result(f'длина шаблона m должна быть от 1 до {MAX_PATTERN_BITS - 1}')
+    if n < m + 1:
+        return _error_result(f'последовательность короче шаблона ({m + 1} бит)')
+
+    # 1. Частоты шаблонов длины m + 1 и m
+    counts_next = pattern_counts(bits, m + 1)
+    counts_m = _marginal_counts(counts_next)
+
+    # 2. Приближённая энтропия ApEn = Φ_m - Φ_m+1
+    apen = _phi(counts_m, n) - _phi(counts_next, n)
+
+    # 3. Статистика хи-квадрат и P-значение
+    chi_square = 2 * n * (math.log(2) - apen)
+    p_value = igamc(2 ** (m - 1), chi_square / 2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Длина шаблона m: {m}\n"
+        f"ApEn = {apen:.6f}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Линейная сложность двоичной последовательности длины length алгоритмом
+# Берлекэмпа-Месси над GF(2). Последовательность задаётся целым числом (первый бит -
+# старший), многочлены связи C и B хранятся как целые числа (бит i - коэффициент при x^i),
+# поэтому невязка - чётность popcount(C & окно), а обновление - один XOR со сдвигом
+def berlekamp_massey(value: int, length: int) -> int:
+    c = b = 1
+    complexity = 0
+    last = -1
+    for step in range(length):
+        # Бит i окна равен s_(step - i)
+        window = value >> (length - 1 - step)
+        if (c & window).bit_count() & 1:
+            previous = c
+            c ^= b << (step - last)
+            if 2 * complexity <= step:
+                complexity = step + 1 - complexity
+                last = step
+                b = previous
+    return complexity
+
+
+# Линейные сложности набора блоков (выполняется в отдельном процессе)
+def _linear_complexities(values: list, block_size: int) -> list:
+    return [berlekamp_massey(value, block_size) for value in values]
+
+
+# Вероятности классов статистики T_i теста линейной сложности (NIST SP 800-22, 2.10)
+LINEAR_COMPLEXITY_PI = [0.010417, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833]
+
+
+# Тест линейной сложности (NIST SP 800-22, 2.10).
+# Независимые M-битные блоки распределяются по пулу процессов (workers > 1);
+# при небольшом числе блоков запуск пула дороже самих вычислений
+def linear_complexity_test(bit_sequence: str | BitSequence, block_size: int = 500, alpha: float = None,
+                           workers: int = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    if block_size < 1:
+        return _error_result('размер блока M должен быть положительным')
+    n = len(bits)
+    blocks = n // block_size
+    if blocks == 0:
+        return _not_applicable_result(f'последовательность короче блока ({block_size} бит)')
+
+    # 1. Линейная сложность каждого блока
+    values = [bits[i * block_size:(i + 1) * block_size].to_int() for i in range(blocks)]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if blocks >= 1000 else 1
+    if workers > 1:
+        size = -(-blocks // (workers * 4))
+        parts = [values[i:i + size] for i in range(0, blocks, size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            complexities = [c for part in pool.map(_linear_complexities, parts, [block_size] * len(parts))
+                            for c in part]
+    else:
+        complexities = _linear_complexities(values, block_size)
+
+    # 2. Ожидаемое значение μ и статистики T_i по классам v_0..v_6
+    # (последнее слагаемое через ldexp: 2^M не помещается во float уже при M ≥ 1024)
+    sign = -1 if block_size % 2 else 1
+    mu = block_size / 2 + (9 - sign) / 36 - math.ldexp(block_size / 3 + 2 / 9, -block_size)
+    counts = [0] * 7
+    for complexity in complexities:
+        t = sign * (complexity - mu) + 2 / 9
+        counts[min(max(math.ceil(t - 0.5) + 3, 0), 6)] += 1
+
+    # 3. Статистика хи-квадрат и P-значение
+    pi = LINEAR_COMPLEXITY_PI
+    chi_square = sum((counts[i] - blocks * pi[i]) ** 2 / (blocks * pi[i]) for i in range(7))
+    p_value = igamc(3, chi_square / 2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Размер блока M: {block_size} бит, число блоков N: {blocks}\n"
+        f"Ожидаемая линейная сложность μ = {mu:.6f}\n"
+        f"Частоты классов v0..v6: {counts}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'complexities': complexities,
+        'description': description
+    }
+
+
+# Ранг двоичной матрицы над GF(2); строки - целые числа
+def _gf2_rank(rows: list) -> int:
+    rows = list(rows)
+    rank = 0
+    for column in range(31, -1, -1):
+        bit = 1 << column
+        pivot = next((i for i in range(rank, len(rows)) if rows[i] & bit), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        for i in range(rank + 1, len(rows)):
+            if rows[i] & bit:
+                rows[i] ^= rows[rank]
+        rank += 1
+    return rank
+
+
+# Ранги набора матриц 32x32 (массив строк-слов формы (число матриц, 32)).
+# Исключение Гаусса выполняется для всех матриц сразу: на каждом шаге для каждой
+# матрицы выбирается ведущая строка с единицей в текущем столбце и XOR-ится
+# в остальные неиспользованные строки с единицей в этом столбце
+def _batched_gf2_ranks(rows):
+    count = len(rows)
+    rows = rows.copy()
+    used = np.zeros(rows.shape, dtype=bool)
+    ranks = np.zeros(count, dtype=np.int64)
+    index = np.arange(count)
+    for column in range(31, -1, -1):
+        bit = np.uint32(1 << column)
+        candidates = ((rows & bit) != 0) & ~used
+        found = candidates.any(axis=1)
+        pivot = candidates.argmax(axis=1)
+        pivot_rows = rows[index, pivot]
+        candidates[index, pivot] = False
+        candidates &= found[:, None]
+        rows ^= np.where(candidates, pivot_rows[:, None], np.uint32(0))
+        used[index[found], pivot[found]] = True
+        ranks += found
+    return ranks
+
+
+# Вероятность того, что случайная двоичная матрица rows x columns имеет ранг rank
+def _rank_probability(rank: int, rows: int = 32, columns: int = 32) -> float:
+    product = 1.0
+    for i in range(rank):
+        product *= (1 - 2.0 ** (i - rows)) * (1 - 2.0 ** (i - columns)) / (1 - 2.0 ** (i - rank))
+    return 2.0 ** (rank * (rows + columns - rank) - rows * columns) * product
+
+
+# Тест рангов двоичных матриц 32x32 (NIST SP 800-22, 2.5).
+# Каждая строка матрицы - одно 32-битное слово, исключение выполняется XOR-ом слов
+def matrix_rank_test(bit_sequence: str | BitSequence, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+    matrices = n // 1024
+    if matrices == 0:
+        return _not_applicable_result('для теста нужно не менее 1024 бит')
+
+    # 1. Ранги всех матриц (порциями, чтобы ограничить память)
+    data = bits.to_bytes()
+    full = partial = 0
+    if np is None:
+        for k in range(matrices):
+            block = data[k * 128:(k + 1) * 128]
+            rank = _gf2_rank(int.from_bytes(block[i:i + 4], 'big') for i in range(0, 128, 4))
+            full += rank == 32
+            partial += rank == 31
+    else:
+        step = 1 << 15
+        for first in range(0, matrices, step):
+            last = min(matrices, first + step)
+            words = np.frombuffer(data[first * 128:last * 128], dtype='>u4').astype(np.uint32)
+            ranks = _batched_gf2_ranks(words.reshape(-1, 32))
+            full += int(np.count_nonzero(ranks == 32))
+            partial += int(np.count_nonzero(ranks == 31))
+    rest = matrices - full - partial
+
+    # 2. Статистика хи-квадрат и P-значение
+    p32 = _rank_probability(32)
+    p31 = _rank_probability(31)
+    p30 = 1 - p32 - p31
+    chi_square = ((full - p32 * matrices) ** 2 / (p32 * matrices) +
+                  (partial - p31 * matrices) ** 2 / (p31 * matrices) +
+                  (rest - p30 * matrices) ** 2 / (p30 * matrices))
+    p_value = math.exp(-chi_square / 2)
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Число матриц 32x32: {matrices}\n"
+        f"Ранг 32: {full}, ранг 31: {partial}, ранг ≤ 30: {rest}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Параметры универсального теста Маурера (NIST SP 800-22, 2.9):
+# длина блока L -> (минимальная длина n, ожидаемое значение, дисперсия)
+UNIVERSAL_PARAMETERS = {
+    6: (387840, 5.2177052, 2.954),
+    7: (904960, 6.1962507, 3.125),
+    8: (2068480, 7.1836656, 3.238),
+    9: (4654080, 8.1764248, 3.311),
+    10: (10342400, 9.1723243, 3.356),
+    11: (22753280, 10.170032, 3.384),
+    12: (49643520, 11.168765, 3.401),
+    13: (107560960, 12.168070, 3.410),
+    14: (231669760, 13.167693, 3.416),
+    15: (496435200, 14.167488, 3.419),
+    16: (1059061760, 15.167379, 3.421),
+}
+
+
+# Значения L-битных блоков с номерами [first, last), прочитанные прямо из упакованных
+# байтов: блок i начинается с бита i·L и целиком лежит в 24-битном слове байта (i·L) // 8
+def _read_blocks(data: bytes, first: int, last: int, length: int):
+    positions = np.arange(first, last, dtype=np.int64) * length
+    offset = int(positions[0]) // 8
+    chunk = np.frombuffer(data[offset:int(positions[-1]) // 8 + 3] + bytes(2), dtype=np.uint8).astype(np.uint32)
+    k = (positions >> 3) - offset
+    words = chunk[k] << 16 | chunk[k + 1] << 8 | chunk[k + 2]
+    return (words >> (24 - (positions & 7) - length).astype(np.uint32)) & ((1 << length) - 1)
+
+
+# Сумма log2 расстояний до предыдущего появления того же блока по тестовым блокам.
+# Таблица последних появлений - заранее выделенный массив из 2^L элементов
+def _universal_sum(bits, length: int, init_blocks: int, test_blocks: int) -> float:
+    total_blocks = init_blocks + test_blocks
+    table_size = 1 << length
+    if np is None:
+        table = [0] * table_size
+        total = 0.0
+        mask = table_size - 1
+        step = 4096
+        # Блоки читаются порциями, чтобы сдвиги выполнялись над небольшими числами
+        for first in range(0, total_blocks, step):
+            last = min(total_blocks, first + step)
+            value = bits[first * length:last * length].to_int()
+            for i in range(first + 1, last + 1):
+                block = (value >> ((last - i) * length)) & mask
+                if i > init_blocks:
+                    total += math.log2(i - table[block])
+                table[block] = i
+        return total
+
+    table = np.zeros(table_size, dtype=np.int64)
+    data = bits.to_bytes()
+    total = 0.0
+    step = 1 << 20
+    for first in range(0, total_blocks, step):
+        last = min(total_blocks, first + step)
+        values = _read_blocks(data, first, last, length)
+        # Предыдущее появление внутри порции - через устойчивую сортировку по значению,
+        # для первого появления в порции - из таблицы предыдущих порций
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        indices = order + first + 1  # номера блоков с единицы
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = sorted_values[1:] != sorted_values[:-1]
+        previous = np.empty(len(order), dtype=np.int64)
+        previous[1:] = indices[:-1]
+        previous[starts] = table[sorted_values[starts]]
+        test = indices > init_blocks
+        total += float(np.log2(indices[test] - previous[test]).sum())
+        ends = np.roll(starts, -1)
+        table[sorted_values[ends]] = indices[ends]
+    return total
+
+
+# Универсальный статистический тест Маурера (NIST SP 800-22, 2.9)
+# block_length=None выбирает L по длине последовательности
+def universal_test(bit_sequence: str | BitSequence, block_length: int = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+
+    if block_length is None:
+        suitable = [length for length, (min_n, _, _) in UNIVERSAL_PARAMETERS.items() if n >= min_n]
+        if not suitable:
+            return _not_applicable_result('для теста нужно не менее 387840 бит')
+        block_length = max(suitable)
+    if block_length not in UNIVERSAL_PARAMETERS:
+        return _error_result('длина блока L должна быть от 6 до 16')
+    L = block_length
+    _, expected, variance = UNIVERSAL_PARAMETERS[L]
+    Q = 10 * 2 ** L
+    K = n // L - Q
+    if K <= 0:
+        return _not_applicable_result(f'для L = {L} нужно больше {Q * L} бит')
+
+    # 1. Статистика fn - среднее log2 расстояний между повторениями блоков
+    fn = _universal_sum(bits, L, Q, K) / K
+
+    # 2. P-значение
+    c = 0.7 - 0.8 / L + (4 + 32 / L) * K ** (-3 / L) / 15
+    sigma = c * math.sqrt(variance / K)
+    p_value = math.erfc(abs(fn - expected) / (math.sqrt(2) * sigma))
+    passed = p_value >= alpha
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Длина блока L: {L}, блоков инициализации Q: {Q}, тестовых блоков K: {K}\n"
+        f"Статистика fn = {fn:.6f}, ожидаемое значение: {expected}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': fn,
+        'threshold': alpha,
+        'p_value': p_value,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Апериодические шаблоны длины m: никакой собственный сдвиг шаблона не совпадает
+# с ним на пересечении, поэтому вхождения одного шаблона не могут перекрываться
+def aperiodic_templates(m: int) -> list:
+    templates = []
+    for value in range(1 << m):
+        text = format(value, f'0{m}b')
+        if all(text[shift:] != text[:m - shift] for shift in range(1, m)):
+            templates.append(value)
+    return templates
+
+
+# Частоты всех m-битных окон, целиком лежащих внутри участка [start, stop)
+def _range_window_counts(bits, start: int, stop: int, m: int):
+    if np is None:
+        mask = (1 << m) - 1
+        counts = [0] * (1 << m)
+        value = 0
+        for i, bit in enumerate(bits[start:stop]):
+            value = ((value << 1) | bit) & mask
+            if i >= m - 1:
+                counts[value] += 1
+        return counts
+    counts = np.zeros(1 << m, dtype=np.int64)
+    for _, _, values in _iter_windows(bits.to_bytes(), start, stop - m, m):
+        counts += np.bincount(values, minlength=1 << m)
+    return counts
+
+
+# Наименьшее ожидаемое число вхождений шаблона в блок для теста непересекающихся
+# шаблонов: при меньшем μ хвосты хи-квадрат для отдельных шаблонов неточны и тест
+# отвергает случайную последовательность намного чаще, чем с вероятностью alpha
+MIN_TEMPLATE_MEAN = 20
+
+
+# Тест непересекающихся шаблонов (NIST SP 800-22, 2.7) для всех апериодических
+# m-битных шаблонов сразу. Для апериодического шаблона число непересекающихся
+# вхождений равно числу всех вхождений, поэтому один проход скользящего окна
+# с таблицей частот (bincount) по каждому блоку даёт счётчики всех шаблонов.
+# Шаблоны проверяются одновременно: итог - число шаблонов с P < alpha против
+# наибольшего числа, объяснимого случайностью (биномиальное распределение B(S, alpha))
+def non_overlapping_template_test(bit_sequence: str | BitSequence, m: int = 9, blocks: int = 8,
+                                  templates: list = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    if not 2 <= m <= MAX_PATTERN_BITS:
+        return _error_result(f'длина шаблона m должна быть от 2 до {MAX_PATTERN_BITS}')
+    if blocks < 1:
+        return _error_result('число блоков N должно быть положительным')
+    # Подсчёт всех вхождений верен только для апериодических шаблонов
+    aperiodic = aperiodic_templates(m)
+    if templates is None:
+        templates = aperiodic
+    else:
+        known = set(aperiodic)
+        periodic = [format(t, f'0{m}b') for t in templates if t not in known]
+        if periodic:
+            return _error_result(f'шаблоны {", ".join(periodic)} не апериодические или не {m}-битные')
+    n = len(bits)
+    M = n // blocks
+    if M < m:
+        return _not_applicable_result(f'блок ({M} бит) короче шаблона ({m} бит)')
+
+    # 1. Ожидаемое значение и дисперсия числа вхождений
+    mu = (M - m + 1) / 2 ** m
+    sigma_square = M * (1 / 2 ** m - (2 * m - 1) / 2 ** (2 * m))
+    if mu < MIN_TEMPLATE_MEAN:
+        return _not_applicable_result(f'ожидаемое число вхождений шаблона в блок μ = {mu:.2f} меньше '
+                                      f'{MIN_TEMPLATE_MEAN}, нужно не менее '
+                                      f'{blocks * (MIN_TEMPLATE_MEAN * 2 ** m + m - 1)} бит')
+
+    # 2. Счётчики всех шаблонов в каждом блоке
+    counts = [_range_window_counts(bits, j * M, (j + 1) * M, m) for j in range(blocks)]
+
+    # 3. Хи-квадрат и P-значение для каждого шаблона
+    p_values = {}
+    for template in templates:
+        chi_square = sum((int(block[template]) - mu) ** 2 for block in counts) / sigma_square
+        p_values[format(template, f'0{m}b')] = igamc(blocks / 2, chi_square / 2)
+    p_value = min(p_values.values())
+    failed = sum(p < alpha for p in p_values.values())
+    allowed = 0
+    while 1 - _binomial_cdf(allowed, len(p_values), alpha) > alpha:
+        allowed += 1
+    passed = failed <= allowed
+    worst = min(p_values, key=p_values.get)
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Длина шаблона m: {m}, шаблонов: {len(p_values)}\n"
+        f"Число блоков N: {blocks}, размер блока M: {M} бит, μ = {mu:.6f}\n"
+        f"Наихудший шаблон: {worst}, P-значение: {p_value:.6f}\n"
+        f"Шаблонов с P < {alpha}: {failed}, допустимо случайных: {allowed}\n"
+        f"Условие: {failed} ≤ {allowed} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': failed,
+        'threshold': allowed,
+        'p_value': p_value,
+        'p_values': p_values,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Вероятности классов 0..5 вхождений для m=9, M=1032 (SP 800-22 rev1a, 2.8.4)
+OVERLAPPING_TEMPLATE_PI = [0.364091, 0.185659, 0.139381, 0.100571, 0.070432, 0.139865]
+
+
+# Вероятность u вхождений шаблона в блок для теста пересекающихся шаблонов (NIST STS)
+def _overlapping_probability(u: int, eta: float) -> float:
+    if u == 0:
+        return math.exp(-eta)
+    return sum(math.exp(-eta - u * math.log(2) + l * math.log(eta) - math.lgamma(l + 1) +
+                        math.lgamma(u) - math.lgamma(l) - math.lgamma(u - l + 1))
+               for l in range(1, u + 1))
+
+
+# Число пересекающихся вхождений шаблона в каждый M-битный блок
+def _template_block_counts(bits, template: int, m: int, block_size: int, blocks: int):
+    if np is None:
+        mask = (1 << m) - 1
+        counts = []
+        for j in range(blocks):
+            value = 0
+            found = 0
+            for i, bit in enumerate(bits[j * block_size:(j + 1) * block_size]):
+                value = ((value << 1) | bit) & mask
+                if i >= m - 1 and value == template:
+                    found += 1
+            counts.append(found)
+        return counts
+    counts = np.zeros(blocks, dtype=np.int64)
+    last = blocks * block_size - m
+    for r, k0, values in _iter_windows(bits.to_bytes(), 0, last, m):
+        positions = (np.flatnonzero(values == template) + k0) * 8 + r
+        # Окна, выходящие за границу своего блока, не считаются
+        positions = positions[positions % block_size <= block_size - m]
+        counts += np.bincount(positions // block_size, minlength=blocks)
+    return counts
+
+
+# Тест пересекающихся шаблонов (NIST SP 800-22, 2.8); по умолчанию шаблон из m единиц
+def overlapping_template_test(bit_sequence: str | BitSequence, m: int = 9, block_size: int = 1032,
+                              template: int = None, alpha: float = None) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    if not 2 <= m <= MAX_PATTERN_BITS:
+        return _error_result(f'длина шаблона m должна быть от 2 до {MAX_PATTERN_BITS}')
+    if block_size < 1:
+        return _error_result('размер блока M должен быть положительным')
+    if template is None:
+        template = (1 << m) - 1
+    n = len(bits)
+    blocks = n // block_size
+    if blocks == 0:
+        return _not_applicable_result(f'последовательность короче блока ({block_size} бит)')
+
+    # 1. Число вхождений шаблона в каждый блок и распределение по классам 0..5
+    K = 5
+    found = _template_block_counts(bits, template, m, block_size, blocks)
+    if isinstance(found, list):
+        classes = [0] * (K + 1)
+        for count in found:
+            classes[min(count, K)] += 1
+    else:
+        classes = np.bincount(np.minimum(found, K), minlength=K + 1).tolist()
+
+    # 2. Теоретические вероятности классов: для стандартных m=9, M=1032 -
+    # уточнённые значения SP 800-22 rev1a, иначе приближение через Pr(u, eta)
+    if (m, block_size) == (9, 1032):
+        pi = OVERLAPPING_TEMPLATE_PI
+    else:
+        eta = (block_size - m + 1) / 2 ** m / 2
+        pi = [_overlapping_probability(u, eta) for u in range(K)]
+        pi.append(1 - sum(pi))
+
+    # 3. Статистика хи-квадрат и P-значение
+    chi_square = sum((classes[i] - blocks * pi[i]) ** 2 / (blocks * pi[i]) for i in range(K + 1))
+    p_value = igamc(K / 2, chi_square / 2)
+    passed = p_value >= alpha
+    name = format(template, f'0{m}b')
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Шаблон: {name}, размер блока M: {block_size}, число блоков N: {blocks}\n"
+        f"Частоты классов (0..≥{K} вхождений): {classes}\n"
+        f"Статистика хи-квадрат = {chi_square:.6f}\n"
+        f"P-значение: {p_value:.6f}\n"
+        f"Условие: P ≥ {alpha} -> {p_value:.6f} ≥ {alpha} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': chi_square,
+        'threshold': alpha,
+        'p_value': p_value,
+        'p_values': {name: p_value},
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Вероятность того, что цикл блуждания посетит состояние x ровно k раз
+# (k = 5 - пять и более, NIST SP 800-22, 2.14)
+def _excursion_probability(x: int, k: int) -> float:
+    leave = 1 / (2 * abs(x))
+    if k == 0:
+        return 1 - leave
+    if k < 5:
+        return leave ** 2 * (1 - leave) ** (k - 1)
+    return leave * (1 - leave) ** 4
+
+
+# Статистика блуждания для тестов случайных отклонений: накопитель из streaming
+# или последовательность, которая проходит через накопитель порциями.
+# Тесты неприменимы, если циклов меньше max(500, 0.005·√n)
+# Возвращает (статистика, None) или (None, результат с ошибкой или неприменимостью)
+def _excursion_statistics(bit_sequence: str | BitSequence | ExcursionsAccumulator) -> tuple:
+    if not isinstance(bit_sequence, ExcursionsAccumulator):
+        bits, error = _prepare_bits(bit_sequence)
+        if error:
+            return None, error
+        bit_sequence = ExcursionsAccumulator().update(bits)
+    stats = bit_sequence.statistics()
+    limit = max(500, 0.005 * math.sqrt(stats['n']))
+    if stats['cycles'] < limit:
+        return None, _not_applicable_result(f"число циклов блуждания J = {stats['cycles']} меньше {limit:g}")
+    return stats, None
+
+
+# Тест случайных отклонений (NIST SP 800-22, 2.14): распределение циклов блуждания
+# по числу посещений состояний -4..-1, 1..4. Восемь состояний проверяются
+# одновременно, поэтому общий итог - с поправкой Бонферрони
+def random_excursions_test(bit_sequence: str | BitSequence | ExcursionsAccumulator,
+                           alpha: float = None) -> dict:
+    stats, error = _excursion_statistics(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    cycles = stats['cycles']
+
+    # Хи-квадрат и P-значение для каждого состояния
+    p_values = {}
+    for x, counts in stats['cycle_counts'].items():
+        pi = [_excursion_probability(x, k) for k in range(6)]
+        chi_square = sum((counts[k] - cycles * pi[k]) ** 2 / (cycles * pi[k]) for k in range(6))
+        p_values[x] = igamc(5 / 2, chi_square / 2)
+    p_value = min(p_values.values())
+    corrected = alpha / len(p_values)
+    passed = p_value >= corrected
+
+    description = (
+        f"Длина последовательности: {stats['n']} бит\n"
+        f"Число циклов блуждания J: {cycles}\n"
+        + ''.join(f"Состояние {x:+d}: P = {p:.6f}\n" for x, p in p_values.items()) +
+        f"Условие: min P ≥ {alpha}/{len(p_values)} -> {p_value:.6f} ≥ {corrected:.6g} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': p_value,
+        'threshold': corrected,
+        'p_value': p_value,
+        'p_values': p_values,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Вариант теста случайных отклонений (NIST SP 800-22, 2.15): общее число посещений
+# состояний -9..-1, 1..9 по всем циклам; проверка с поправкой Бонферрони
+def random_excursions_variant_test(bit_sequence: str | BitSequence | ExcursionsAccumulator,
+                                   alpha: float = None) -> dict:
+    stats, error = _excursion_statistics(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    cycles = stats['cycles']
+
+    p_values = {x: math.erfc(abs(visits - cycles) / math.sqrt(2 * cycles * (4 * abs(x) - 2)))
+                for x, visits in stats['visits'].items()}
+    p_value = min(p_values.values())
+    corrected = alpha / len(p_values)
+    passed = p_value >= corrected
+    worst = min(p_values, key=p_values.get)
+
+    description = (
+        f"Длина последовательности: {stats['n']} бит\n"
+        f"Число циклов блуждания J: {cycles}\n"
+        f"Наихудшее состояние: {worst:+d}, посещений: {stats['visits'][worst]}, P-значение: {p_value:.6f}\n"
+        f"Условие: min P ≥ {alpha}/{len(p_values)} -> {p_value:.6f} ≥ {corrected:.6g} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': p_value,
+        'threshold': corrected,
+        'p_value': p_value,
+        'p_values': p_values,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Число сдвигов теста автокорреляции по умолчанию (все сдвиги - max_lag = n - 1)
+AUTOCORRELATION_MAX_LAG = 1 << 16
+
+# Наименьшая длина блока при вычислении автокорреляции через БПФ (бит)
+_CORRELATION_BLOCK = 1 << 16
+
+
+# Корреляции C(d) = Σ x_i·x_(i+d) последовательности x_i = ±1 для сдвигов d = 0..max_lag.
+# Последовательность делится на блоки длины L ≥ max_lag, каждый блок преобразуется
+# один раз (БПФ размера 2L, без циклического переноса). Пары (i, i + d) внутри блока
+# дают Σ|X_k|², пары из соседних блоков - Σ conj(X_k)·X_(k+1); спектры суммируются,
+# и обратное преобразование выполняется один раз в конце. Всего O(n log n) вместо
+# O(n·max_lag) при прямом переборе.
+# С NumPy возвращает массив, без него - список (popcount(v XOR (v >> d)) для каждого d)
+def _autocorrelations(bits, max_lag: int):
+    n = len(bits)
+    if np is None:
+        value = bits.to_int()
+        correlations = []
+        for d in range(max_lag + 1):
+            disagreements = ((value ^ (value >> d)) & ((1 << (n - d)) - 1)).bit_count()
+            correlations.append(n - d - 2 * disagreements)
+        return correlations
+
+    block = max(_CORRELATION_BLOCK, 1 << (max_lag - 1).bit_length())
+    size = 2 * block
+    auto = np.zeros(block + 1, dtype=np.complex128)
+    cross = np.zeros(block + 1, dtype=np.complex128)
+    previous = None
+    for start in range(0, n, block):
+        x = bits.unpack(start, min(n, start + block)).astype(np.float64) * 2 - 1
+        spectrum = np.fft.rfft(x, size)
+        auto += spectrum.real ** 2 + spectrum.imag ** 2
+        if previous is not None:
+            cross += np.conj(previous) * spectrum
+        previous = spectrum
+    # Сдвигу d между соседними блоками соответствует индекс (d - L) mod 2L
+    lags = np.arange(max_lag + 1)
+    correlations = np.fft.irfft(auto, size)[lags] + np.fft.irfft(cross, size)[(lags + block) % size]
+    return np.rint(correlations).astype(np.int64)
+
+
+# Тест автокорреляции для всех сдвигов d = 1..max_lag. Для каждого сдвига
+# A(d) = Σ b_i XOR b_(i+d) = ((n - d) - C(d)) / 2 и нормированная статистика
+# z(d) = 2·(A(d) - (n - d)/2) / √(n - d) ~ N(0, 1). Сдвиги проверяются одновременно,
+# поэтому общий итог - с поправкой Бонферрони; наихудшие сдвиги выводятся отдельно
+def autocorrelation_test(bit_sequence: str | BitSequence, max_lag: int = None, alpha: float = None,
+                         worst: int = 10) -> dict:
+    bits, error = _prepare_bits(bit_sequence)
+    if error:
+        return error
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    n = len(bits)
+    if n < 2:
+        return _error_result('для теста нужно не менее 2 бит')
+    if max_lag is None:
+        max_lag = min(n // 2, AUTOCORRELATION_MAX_LAG)
+    if not 1 <= max_lag < n:
+        return _error_result(f'наибольший сдвиг должен быть от 1 до {n - 1}')
+
+    # 1. Корреляции для всех сдвигов сразу
+    correlations = _autocorrelations(bits, max_lag)
+
+    # 2. Нормированные статистики (элемент d соответствует сдвигу d, элемент 0 не используется)
+    if np is None:
+        z_values = [0.0] + [-correlations[d] / math.sqrt(n - d) for d in range(1, max_lag + 1)]
+        order = sorted(range(1, max_lag + 1), key=lambda d: -abs(z_values[d]))[:worst]
+    else:
+        lags = np.arange(max_lag + 1)
+        z_values = -correlations / np.sqrt(n - lags)
+        z_values[0] = 0.0
+        order = (np.argsort(-np.abs(z_values[1:]), kind='stable')[:worst] + 1).tolist()
+
+    # 3. Наихудшие сдвиги и итог с поправкой Бонферрони. Наименьшее P-значение
+    # не распределено равномерно, поэтому как P-значение теста выдаётся
+    # поправка Шидака 1 - (1 - min P)^max_lag - равномерная для независимых сдвигов
+    worst_lags = [(d, float(z_values[d]), math.erfc(abs(float(z_values[d])) / math.sqrt(2))) for d in order]
+    min_p_value = worst_lags[0][2]
+    p_value = -math.expm1(max_lag * math.log1p(-min_p_value)) if min_p_value < 1 else 1.0
+    corrected = alpha / max_lag
+    passed = min_p_value >= corrected
+
+    description = (
+        f"Длина последовательности: {n} бит\n"
+        f"Проверено сдвигов: 1..{max_lag}\n"
+        f"Наихудшие сдвиги (d, z, P):\n"
+        + ''.join(f"  d = {d}: z = {z:+.4f}, P = {p:.6f}\n" for d, z, p in worst_lags) +
+        f"P-значение с поправкой Шидака: {p_value:.6f}\n"
+        f"Условие: min P ≥ {alpha}/{max_lag} -> {min_p_value:.6f} ≥ {corrected:.6g} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': worst_lags[0][1],
+        'threshold': corrected,
+        'p_value': p_value,
+        'min_p_value': min_p_value,
+        'z_values': z_values,
+        'worst_lags': worst_lags,
+        'alpha': alpha,
+        'description': description
+    }
+
+
+# Тест батареи, которому нужна сама последовательность, а не только общая статистика
+def _sequence_test(test):
+    def run(stats: dict, alpha: float = None) -> dict:
+        if stats['bits'] is None:
+            return _error_result('тесту нужна вся последовательность, а не накопленная статистика')
+        return test(stats['bits'], alpha=alpha)
+    return run
+
+
+# Тесты батареи: имя -> (название, функция от общей статистики и alpha,
+# нужна ли тесту сама последовательность)
+BATTERY_TESTS = {
+    'frequency': ('Частотный тест', _frequency_from_stats, False),
+    'runs': ('Тест на последовательность одинаковых бит', _runs_from_stats, False),
+    'block_frequency': ('Тест частот в блоках', _sequence_test(block_frequency_test), True),
+    'longest_run': ('Тест на самую длинную серию единиц в блоке', _sequence_test(longest_run_test), True),
+    'cumulative_sums': ('Тест кумулятивных сумм', _sequence_test(cumulative_sums_test), True),
+    'spectral': ('Спектральный тест (ДПФ)', _sequence_test(spectral_test), True),
+    'serial': ('Последовательный тест', _sequence_test(serial_test), True),
+    'approximate_entropy': ('Тест приближённой энтропии', _sequence_test(approximate_entropy_test), True),
+    'linear_complexity': ('Тест линейной сложности', _sequence_test(linear_complexity_test), True),
+    'matrix_rank': ('Тест рангов двоичных матриц', _sequence_test(matrix_rank_test), True),
+    'universal': ('Универсальный тест Маурера', _sequence_test(universal_test), True),
+    'non_overlapping_template': ('Тест непересекающихся шаблонов', _sequence_test(non_overlapping_template_test), True),
+    'overlapping_template': ('Тест пересекающихся шаблонов', _sequence_test(overlapping_template_test), True),
+    'random_excursions': ('Тест случайных отклонений', _sequence_test(random_excursions_test), True),
+    'random_excursions_variant': ('Вариант теста случайных отклонений', _sequence_test(random_excursions_variant_test), True),
+    'autocorrelation': ('Тест автокорреляции', _sequence_test(autocorrelation_test), True),
+}
+
+
+# Запуск набора тестов: проверка и сбор статистики выполняются один раз
+def run_battery(bit_sequence: str | BitSequence | FrequencyAccumulator, tests: list = None,
+                alpha: float = None) -> dict:
+    # Для накопителя по умолчанию выполняются только тесты по общей статистике
+    if tests is None and isinstance(bit_sequence, FrequencyAccumulator):
+        tests = [name for name, entry in BATTERY_TESTS.items() if not entry[2]]
+    if tests is None:
+        tests = list(BATTERY_TESTS)
+    for name in tests:
+        if name not in BATTERY_TESTS:
+            raise ValueError(f"Неизвестный тест: {name}")
+
+    stats, error = collect_statistics(bit_sequence)
+    results = {}
+    for name in tests:
+        results[name] = error if error else BATTERY_TESTS[name][1](stats, alpha)
+    return results
+
+
+# Пакетный анализ K независимых последовательностей по n бит от одного генератора
+# (или из готовой последовательности длиной не менее K*n бит).
+# Для каждого теста считается доля пройденных последовательностей с минимальным
+# допустимым значением (1 - alpha) - 3·sqrt(alpha(1 - alpha)/K) и проверка равномерности
+# P-значений по гистограмме из 10 интервалов (хи-квадрат, порог 0.0001), как в NIST SP 800-22.
+# Каждое P-значение из result['p_values'] (шаблоны, состояния, прямое и обратное
+# направление) - отдельный подтест со своей долей и гистограммой; неприменимые
+# к последовательности результаты не учитываются
+def run_batch(source, k: int, n: int, tests: list = None, alpha: float = DEFAULT_ALPHA) -> dict:
+    if tests is None:
+        tests = list(BATTERY_TESTS)
+    for name in tests:
+        if name not in BATTERY_TESTS:
+            raise ValueError(f"Неизвестный тест: {name}")
+    if k <= 0 or n <= 0:
+        raise ValueError("Число и длина последовательностей должны быть положительными")
+
+    if hasattr(source, 'random_bits'):
+        bits = source.random_bits(k * n, packed=True)
+    else:
+        bits = BitSequence.coerce(source)
+        if len(bits) < k * n:
+            raise ValueError(f"Нужно не менее {k * n} бит, получено {len(bits)}")
+
+    # Статистика всех строк считается одним векторизованным проходом
+    ones, transitions = row_statistics(bits, k, n)
+
+    summary = {}
+    for name in tests:
+        title, test, needs_bits = BATTERY_TESTS[name]
+        subtests = {}  # подтест -> {'p_values': [...], 'passed': число пройденных}
+        skipped = 0
+        for row, (row_ones, row_transitions) in enumerate(zip(ones, transitions)):
+            stats = {
+                'bits': bits[row * n:(row + 1) * n] if needs_bits else None,
+                'n': n,
+                'ones': row_ones,
+                'zeros': n - row_ones,
+                'transitions': row_transitions
+            }
+            result = test(stats, alpha)
+            if result.get('not_applicable'):
+                skipped += 1
+                continue
+            if 'p_values' in result:
+                checks = [(key, p, p >= alpha) for key, p in result['p_values'].items()]
+            else:
+                checks = [(None, result['p_value'], result['passed'])]
+            for key, p, passed in checks:
+                entry = subtests.setdefault(key, {'p_values': [], 'passed': 0})
+                entry['p_values'].append(p)
+                entry['passed'] += passed
+
+        if not subtests:
+            summary[name] = _not_applicable_result(f'{title}: ни к одной из {k} последовательностей')
+        elif len(subtests) == 1:
+            entry = next(iter(subtests.values()))
+            summary[name] = _aggregate(title, entry['p_values'], entry['passed'], alpha, skipped)
+        else:
+            summary[name] = _aggregate_subtests(title, subtests, alpha, skipped)
+    return summary
+
+
+# Сводка по набору P-значений: доля прохождения и равномерность
+def _aggregate(title: str, p_values: list, passed_count: int, alpha: float, skipped: int = 0) -> dict:
+    k = len(p_values)
+    proportion = passed_count / k
+    expected, margin = _proportion_bounds(k, alpha)
+    # Как в NIST STS, ограничивается только нижняя граница (минимальная доля)
+    proportion_ok = proportion >= expected - margin
+
+    histogram = [0] * 10
+    for p in p_values:
+        histogram[min(int(p * 10), 9)] += 1
+    chi_square = sum((count - k / 10) ** 2 / (k / 10) for count in histogram)
+    uniformity_p_value = igamc(9 / 2, chi_square / 2)
+    uniformity_ok = uniformity_p_value >= 0.0001
+
+    description = (
+        f"{title}\n"
+        f"Последовательностей: {k}\n"
+        + (f"Неприменим к последовательностям: {skipped}\n" if skipped else '') +
+        f"Пройдено: {passed_count} ({proportion:.4f})\n"
+        f"Минимальная допустимая доля: {expected - margin:.4f}\n"
+        f"Гистограмма P-значений: {histogram}\n"
+        f"Хи-квадрат = {chi_square:.4f}, P-значение равномерности: {uniformity_p_value:.6f}\n"
+        f"Условие: доля ≥ минимальной и P ≥ 0.0001 -> {proportion_ok and uniformity_ok}"
+    )
+
+    return {
+        'passed': proportion_ok and uniformity_ok,
+        'proportion': proportion,
+        'passed_count': passed_count,
+        'interval': (expected - margin, expected + margin),
+        'histogram': histogram,
+        'uniformity_p_value': uniformity_p_value,
+        'p_values': p_values,
+        'not_applicable_count': skipped,
+        'description': description
+    }
+
+
+# Ожидаемая доля прохождения и допустимое отклонение вниз для k последовательностей
+def _proportion_bounds(k: int, alpha: float) -> tuple:
+    return 1 - alpha, 3 * math.sqrt(alpha * (1 - alpha) / k)
+
+
+# P(X ≤ x) для X ~ B(n, p)
+def _binomial_cdf(x: int, n: int, p: float) -> float:
+    if x < 0:
+        return 0.0
+    if x >= n:
+        return 1.0
+    return min(1.0, sum(math.exp(math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1) +
+                                 i * math.log(p) + (n - i) * math.log1p(-p)) for i in range(x + 1)))
+
+
+# Сводка по тесту из нескольких подтестов: каждый подтест оценивается как в _aggregate.
+# Даже у случайного источника отдельные подтесты изредка не проходят (при 148 шаблонах -
+# почти в каждом втором пакете), поэтому тест считается пройденным, если отказов не больше,
+# чем объясняется случайностью на уровне alpha: вероятность отказа подтеста q берётся из
+# биномиального распределения числа пройденных последовательностей плюс порог 0.0001
+# равномерности, число отказов из S подтестов - как B(S, q)
+def _aggregate_subtests(title: str, subtests: dict, alpha: float, skipped: int = 0) -> dict:
+    parts = {key: _aggregate(f"{title}: {key}", entry['p_values'], entry['passed'], alpha, skipped)
+             for key, entry in subtests.items()}
+    failed = [key for key, part in parts.items() if not part['passed']]
+
+    chances = []
+    for entry in subtests.values():
+        k = len(entry['p_values'])
+        expected, margin = _proportion_bounds(k, alpha)
+        least = math.ceil((expected - margin) * k - 1e-9)
+        chances.append(min(1.0, _binomial_cdf(least - 1, k, expected) + 0.0001))
+    q = sum(chances) / len(chances)
+    allowed = 0
+    while 1 - _binomial_cdf(allowed, len(parts), q) > alpha:
+        allowed += 1
+    passed = len(failed) <= allowed
+
+    description = (
+        f"{title}\n"
+        f"Подтестов: {len(parts)}, последовательностей: {len(next(iter(subtests.values()))['p_values'])}\n"
+        + (f"Неприменим к последовательностям: {skipped}\n" if skipped else '') +
+        f"Не прошли подтесты: {len(failed)}"
+        + (f" ({', '.join(str(key) for key in failed[:10])}{', ...' if len(failed) > 10 else ''})" if failed else '') +
+        f"\nДопустимо случайных отказов: {allowed}\n"
+        f"Условие: отказов ≤ {allowed} -> {len(failed)} ≤ {allowed} = {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'subtests': parts,
+        'failed_subtests': failed,
+        'allowed_failures': allowed,
+        'not_applicable_count': skipped,
+        'description': description
+    }
+
+
+# Параметры быстрой проверки FIPS 140-2 (4.9.1): размер блока, интервалы числа единиц
+# и статистики покер-теста (границы не входят), допустимые числа серий длины 1..5 и 6+
+# для нулей и для единиц (границы входят), длина серии, при которой блок бракуется
+FIPS_BLOCK_BITS = 20000
+FIPS_MONOBIT = (9725, 10275)
+FIPS_POKER = (2.16, 46.17)
+FIPS_RUNS = [(2315, 2685), (1114, 1386), (527, 723), (240, 384), (103, 209), (103, 209)]
+FIPS_LONG_RUN = 26
+
+# Число 20 000-битных блоков, обрабатываемых одним двумерным проходом
+_FIPS_ROWS = 256
+
+
+# Сдвиг строк битов (слова uint64, старший бит - первый) на shift позиций к началу:
+# бит i результата - бит i + shift исходной строки, за концом строки - нули
+def _shift_words(words, shift: int):
+    result = words << np.uint64(shift)
+    result[:, :-1] |= words[:, 1:] >> np.uint64(64 - shift)
+    return result
+
+
+# Числа серий длины 1..5 и 6+ (rows, 6) и признак серии длиной ≥ 26 для серий
+# из единиц строк words. Серий длины ≥ k столько же, сколько начал серий, за которыми
+# идут ещё k - 1 единиц: popcount(начала & x & x<<1 & ... & x<<(k-1)).
+# Произведения P_k строятся удвоением, поэтому хватает нескольких сдвигов слов
+def _fips_runs(words) -> tuple:
+    previous = words >> np.uint64(1)
+    previous[:, 1:] |= words[:, :-1] << np.uint64(63)
+    starts = words & ~previous
+
+    product = {1: words}
+    product[2] = words & _shift_words(words, 1)
+    product[3] = product[2] & _shift_words(words, 2)
+    product[4] = product[2] & _shift_words(product[2], 2)
+    product[5] = product[4] & _shift_words(words, 4)
+    product[6] = product[4] & _shift_words(product[2], 4)
+    product[8] = product[4] & _shift_words(product[4], 4)
+    product[16] = product[8] & _shift_words(product[8], 8)
+    long_product = product[16] & _shift_words(product[8], 16) & _shift_words(product[2], 24)
+
+    at_least = np.stack([_np_row_popcount((starts & product[k]).view(np.uint8)) for k in range(1, 7)], axis=1)
+    runs = at_least.copy()
+    runs[:, :-1] -= at_least[:, 1:]
+    return runs, long_product.any(axis=1)
+
+
+# Число полубайтов каждого значения в байте: таблица 256 x 16 для покер-теста
+_NIBBLE_TABLE = None
+
+
+# Статистики FIPS 140-2 для строк двумерного массива байтов (строка - один блок):
+# частоты полубайтов (rows, 16), числа серий (rows, 2, 6) и признак длинной серии (rows)
+def _fips_rows(x) -> tuple:
+    global _NIBBLE_TABLE
+    rows, row_bytes = x.shape
+
+    # Покер-тест: гистограмма байтов каждой строки, умноженная на таблицу полубайтов
+    if _NIBBLE_TABLE is None:
+        _NIBBLE_TABLE = np.zeros((256, 16), dtype=np.int64)
+        for byte in range(256):
+            _NIBBLE_TABLE[byte, byte >> 4] += 1
+            _NIBBLE_TABLE[byte, byte & 15] += 1
+    offsets = (np.arange(rows) * 256)[:, None]
+    histogram = np.bincount((x + offsets).ravel(), minlength=rows * 256).reshape(rows, 256)
+    nibbles = histogram @ _NIBBLE_TABLE
+
+    # Строки дополняются нулями до целого числа 64-битных слов
+    padded = np.zeros((rows, -(-row_bytes // 8) * 8), dtype=np.uint8)
+    padded[:, :row_bytes] = x
+    ones = padded.view('>u8').astype(np.uint64)
+    valid = np.zeros_like(padded)
+    valid[:, :row_bytes] = 0xFF
+    zeros = ~ones & valid.view('>u8').astype(np.uint64)
+
+    zero_runs, zero_long = _fips_runs(zeros)
+    one_runs, one_long = _fips_runs(ones)
+    return nibbles, np.stack([zero_runs, one_runs], axis=1), zero_long | one_long
+
+
+# Те же статистики для одного блока на чистом Python
+def _fips_block(block) -> tuple:
+    nibbles = [0] * 16
+    for byte in block.to_bytes():
+        nibbles[byte >> 4] += 1
+        nibbles[byte & 15] += 1
+    runs = [[0] * 6, [0] * 6]
+    long_run = False
+    previous = None
+    length = 0
+    for bit in list(block) + [None]:
+        if bit == previous:
+            length += 1
+            continue
+        if previous is not None:
+            runs[previous][min(length, 6) - 1] += 1
+            long_run = long_run or length >= FIPS_LONG_RUN
+        previous = bit
+        length = 1
+    return nibbles, runs, long_run
+
+
+# Быстрая проверка FIPS 140-2 (частотный, покер-тест, серии и длинная серия)
+# по всем подряд идущим 20 000-битным блокам. Источник - генератор с random_bits
+# (тогда нужно задать число блоков) или готовая последовательность.
+# Блоки обрабатываются порциями как строки двумерного массива; результат содержит
+# карту прохождения по блокам (block_passed) и по каждому тесту отдельно
+def fips_battery(source, blocks: int = None) -> dict:
+    if hasattr(source, 'random_bits'):
+        if not blocks or blocks <= 0:
+            return _error_result('для генератора нужно задать положительное число блоков')
+        bits = source.random_bits(blocks * FIPS_BLOCK_BITS, packed=True)
+    else:
+        bits = BitSequence.coerce(source)
+        if blocks is None:
+            blocks = len(bits) // FIPS_BLOCK_BITS
+        if blocks <= 0 or len(bits) < blocks * FIPS_BLOCK_BITS:
+            return _error_result(f'нужно не менее {max(blocks or 1, 1) * FIPS_BLOCK_BITS} бит, получено {len(bits)}')
+
+    # 1. Частотный тест: число единиц в каждом блоке
+    ones = block_ones(bits, FIPS_BLOCK_BITS)[:blocks]
+    monobit = [FIPS_MONOBIT[0] < int(count) < FIPS_MONOBIT[1] for count in ones]
+
+    # 2. Частоты полубайтов, серии и длинные серии
+    poker, runs_ok, long_ok = [], [], []
+    row_bytes = FIPS_BLOCK_BITS // 8
+    data = bits.to_bytes()
+    for first in range(0, blocks, _FIPS_ROWS if np is not None else 1):
+        if np is not None:
+            last = min(blocks, first + _FIPS_ROWS)
+            x = np.frombuffer(data[first * row_bytes:last * row_bytes], dtype=np.uint8).reshape(-1, row_bytes)
+            nibbles, runs, long_run = _fips_rows(x)
+            statistics = 16 / 5000 * (nibbles.astype(np.float64) ** 2).sum(axis=1) - 5000
+            low = np.array([bound[0] for bound in FIPS_RUNS])
+            high = np.array([bound[1] for bound in FIPS_RUNS])
+            runs_passed = ((runs >= low) & (runs <= high)).all(axis=(1, 2))
+            poker.extend(bool(FIPS_POKER[0] < value < FIPS_POKER[1]) for value in statistics)
+            runs_ok.extend(runs_passed.tolist())
+            long_ok.extend((~long_run).tolist())
+        else:
+            nibbles, runs, long_run = _fips_block(bits[first * FIPS_BLOCK_BITS:(first + 1) * FIPS_BLOCK_BITS])
+            statistic = 16 / 5000 * sum(count ** 2 for count in nibbles) - 5000
+            poker.append(FIPS_POKER[0] < statistic < FIPS_POKER[1])
+            runs_ok.append(all(low <= runs[value][i] <= high
+                               for value in (0, 1) for i, (low, high) in enumerate(FIPS_RUNS)))
+            long_ok.append(not long_run)
+
+    # 3. Карта прохождения: блок пройден, если пройдены все четыре теста
+    block_passed = [all(checks) for checks in zip(monobit, poker, runs_ok, long_ok)]
+    passed_blocks = sum(block_passed)
+    failed = [i for i, ok in enumerate(block_passed) if not ok]
+    passed = not failed
+
+    description = (
+        f"Блоков по {FIPS_BLOCK_BITS} бит: {blocks}\n"
+        f"Пройдено блоков: {passed_blocks}\n"
+        f"Не пройден частотный тест: {blocks - sum(monobit)}\n"
+        f"Не пройден покер-тест: {blocks - sum(poker)}\n"
+        f"Не пройден тест серий: {blocks - sum(runs_ok)}\n"
+        f"Не пройден тест длинной серии: {blocks - sum(long_ok)}\n"
+        f"Непройденные блоки: {failed[:20]}{' ...' if len(failed) > 20 else ''}\n"
+        f"Условие: все блоки пройдены -> {passed}"
+    )
+
+    return {
+        'passed': passed,
+        'statistic': passed_blocks,
+        'threshold': blocks,
+        'blocks': blocks,
+        'passed_blocks': passed_blocks,
+        'block_passed': block_passed,
+        'monobit': monobit,
+        'poker': poker,
+        'runs': runs_ok,
+        'long_run': long_ok,
         'description': description
     }
 
@@ -147,10 +1969,10 @@ if __name__ == "__main__":
     # Пример использования
     test_sequence = "0101010101" * 1000  # 10000 бит
 
+    results = run_battery(test_sequence)
+
     print("=== Частотный тест ===")
-    result1 = frequency_test(test_sequence)
-    print(result1['description'])
+    print(results['frequency']['description'])
 
     print("\n=== Тест на последовательность одинаковых бит ===")
-    result2 = runs_test(test_sequence)
-    print(result2['description'])
\ No newline at end of file
+    print(results['runs']['description'])